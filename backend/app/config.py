@@ -10,6 +10,44 @@ class Settings(BaseSettings):
     # Groq
     groq_api_key: str
 
+    # Groq — per-call timeout (seconds), concurrent calls per worker, pooled connections
+    groq_timeout: float = 30.0
+    groq_max_concurrency: int = 8
+    groq_max_connections: int = 20
+    # Groq rate limits for our key (requests / tokens per minute), retries on
+    # 429/5xx, and the share of each budget batch jobs must leave for live chats
+    groq_rpm: int = 30
+    groq_tpm: int = 6000
+    groq_max_retries: int = 4
+    groq_batch_reserve: float = 0.2
+
+    # Chat context — approx. token budget per LLM request; the most recent
+    # turns are always sent verbatim, older ones are summarised
+    context_token_budget: int = 3000
+    context_keep_recent_turns: int = 6
+
+    # Session greetings — pre-generated pool size, and how long a new session
+    # waits on the LLM when the pool is empty before using a static greeting
+    greeting_pool_size: int = 5
+    greeting_timeout: float = 3.0
+
+    # Chat sessions — dropped after this many idle seconds, and least recently
+    # used first beyond max entries / approx. bytes; swept every interval
+    session_idle_ttl: float = 1800.0
+    session_max_entries: int = 10000
+    session_max_bytes: int = 100 * 1024 * 1024
+    session_sweep_interval: float = 60.0
+    # "memory" (single worker) or "mongo" (shared by all workers/instances);
+    # with mongo, a cached session is trusted for session_cache_ttl seconds
+    # before its stored version is re-checked (how long one worker can miss
+    # another's turns), and turns are written behind the response every
+    # session_flush_interval seconds, up to session_flush_batch ops per write
+    session_backend: str = "memory"
+    session_cache_ttl: float = 5.0
+    session_cache_entries: int = 1000
+    session_flush_interval: float = 0.5
+    session_flush_batch: int = 100
+
     # Server
     host: str = "0.0.0.0"
     port: int = 8000
@@ -22,6 +60,45 @@ class Settings(BaseSettings):
 
     # Scraping — set to false in cloud deployment (no Chrome available)
     scraping_enabled: bool = True
+    # "selenium" (headless Chrome) or "http" (plain HTTP + HTML parsing, no
+    # browser). http returns Flipkart prices only — Croma renders client-side
+    scraper_backend: str = "selenium"
+    flipkart_base_url: str = "https://www.flipkart.com"
+    croma_base_url: str = "https://www.croma.com"
+    # HTTP backend: request timeout (seconds) and pooled connections
+    scraper_http_timeout: float = 15.0
+    scraper_http_max_connections: int = 20
+    # Headless browsers kept per site, scrapes before a browser is replaced,
+    # and how long a request waits for a free browser (seconds)
+    scraper_pool_size: int = 2
+    scraper_driver_max_uses: int = 50
+    scraper_pool_timeout: float = 30.0
+    # Price lookups scraped at once across all laptops (requests for the
+    # same laptop share one scrape; the rest wait). Background pre-fetches
+    # get at most one less, so a user's lookup always has a slot
+    scraper_max_concurrent: int = 2
+    # Scraped prices — fresh for this many hours, then served stale (and
+    # refreshed in the background) for stale_hours more before MongoDB's TTL
+    # index drops them; hot entries are also kept in memory per worker
+    price_cache_fresh_hours: float = 6.0
+    price_cache_stale_hours: float = 24.0
+    price_cache_memory_entries: int = 2048
+    price_cache_memory_ttl: float = 300.0
+    # Background pre-fetch of prices for new recommendations — queued
+    # laptops (extra work is dropped) and concurrent warm scrapes
+    price_warm_queue_size: int = 30
+    price_warm_workers: int = 1
+
+    # Catalog snapshot — seconds between version polls when change streams
+    # are unavailable (standalone mongod), and between stream reconnects
+    catalog_poll_interval: float = 30.0
+    # Columnar catalog file written by export_catalog_snapshot.py; memory-mapped
+    # at startup when present so cold starts don't wait on a full fetch
+    catalog_snapshot_path: str = "catalog_snapshot.bin"
+
+    # Ranked results per (profile, budget breakpoint) — also cleared on catalog change
+    recommendation_cache_size: int = 1024
+    recommendation_cache_ttl: float = 600.0
 
     class Config:
         env_file = ".env"
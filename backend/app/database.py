@@ -1,5 +1,10 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, IndexModel
 from app.config import get_settings
+from app.indexes import LAPTOP_INDEXES
+import logging
+
+logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
@@ -27,4 +32,30 @@ async def close_mongo_connection():
         print("❌ Closed MongoDB connection")
 
 def get_database():
-    return async_db
\ No newline at end of file
+    return async_db
+
+
+# collection → indexes the API relies on
+REQUIRED_INDEXES = {
+    "laptops": LAPTOP_INDEXES,
+    "price_cache": [
+        IndexModel([("laptop_name", ASCENDING)], name="laptop_name_1"),
+        # MongoDB drops entries once past the fresh + stale window. Existing
+        # indexes are kept as-is, so drop this one after changing the hours.
+        IndexModel(
+            [("cached_at", ASCENDING)],
+            name="cached_at_ttl",
+            expireAfterSeconds=int((settings.price_cache_fresh_hours + settings.price_cache_stale_hours) * 3600),
+        ),
+    ],
+}
+
+async def ensure_indexes():
+    """Create any missing indexes and log what each collection has."""
+    for collection, indexes in REQUIRED_INDEXES.items():
+        existing = await async_db[collection].index_information()
+        missing = [i for i in indexes if i.document["name"] not in existing]
+        if missing:
+            created = await async_db[collection].create_indexes(missing)
+            logger.info(f"Created indexes on {collection}: {created}")
+        logger.info(f"Indexes on {collection}: {sorted(set(existing) | {i.document['name'] for i in indexes})}")
\ No newline at end of file
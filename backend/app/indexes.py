@@ -0,0 +1,21 @@
+from pymongo import ASCENDING, IndexModel
+from app.services.catalog_engine import SCOREABLE_FEATURES
+from app.services.spec_classifier import NUMERIC_SPEC_FIELDS
+
+# Kept free of app settings so offline scripts (seed_data.py) can import them
+
+LAPTOP_INDEXES = [
+    # Numeric spec fields written at ingest (spec_classifier.numeric_specs)
+    *[IndexModel([(f, ASCENDING)], name=f"{f}_1") for f in NUMERIC_SPEC_FIELDS],
+    # Natural key seed_data.py upserts on; older documents may not have one
+    IndexModel(
+        [("sku_key", ASCENDING)],
+        name="sku_key_1",
+        unique=True,
+        partialFilterExpression={"sku_key": {"$exists": True}},
+    ),
+    IndexModel(
+        [(f"laptop_feature.{f}", ASCENDING) for f in SCOREABLE_FEATURES],
+        name="laptop_feature_levels",
+    ),
+]
@@ -1,8 +1,18 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import get_settings
-from app.database import connect_to_mongo, close_mongo_connection
+from app.database import connect_to_mongo, close_mongo_connection, ensure_indexes
 from app.routes import chat, scraper
+from app.services.catalog_snapshot import catalog_snapshot
+from app.services.recommendation_cache import recommendation_cache
+from app.services.groq_service import groq_service
+from app.services.context_manager import context_manager
+from app.services.greeting_pool import greeting_pool
+from app.services.slot_extractor import slot_extractor
+from app.services.session_store import session_store
+from app.services.scraper_service import start_scrapers, stop_scrapers, get_scraper_stats
+from app.services.price_fetcher import price_fetcher, price_warmer
+from app.services.cache_service import price_cache
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -27,9 +37,22 @@ app.add_middleware(
 @app.on_event("startup")
 async def startup():
     await connect_to_mongo()  # laptop_service uses _get_db() so no initialize() needed
+    await ensure_indexes()
+    await catalog_snapshot.start()
+    await greeting_pool.start()
+    await session_store.start()
+    await start_scrapers()
+    await price_warmer.start()
 
 @app.on_event("shutdown")
 async def shutdown():
+    await price_warmer.stop()
+    await price_fetcher.stop()
+    await stop_scrapers()
+    await session_store.stop()
+    await greeting_pool.stop()
+    await catalog_snapshot.stop()
+    await groq_service.close()
     await close_mongo_connection()
 
 app.include_router(chat.router, prefix="/api/chat", tags=["chat"])
@@ -37,4 +60,20 @@ app.include_router(scraper.router, prefix="/api/scraper", tags=["scraper"])
 
 @app.get("/health")
 async def health():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+@app.get("/stats")
+async def stats():
+    return {
+        "catalog": catalog_snapshot.get_stats(),
+        "recommendations": recommendation_cache.get_stats(),
+        "context": context_manager.get_stats(),
+        "greetings": greeting_pool.get_stats(),
+        "sessions": session_store.get_stats(),
+        "slots": slot_extractor.get_stats(),
+        "groq": groq_service.scheduler.get_stats(),
+        "scrapers": get_scraper_stats(),
+        "prices": price_fetcher.get_stats(),
+        "price_cache": price_cache.get_stats(),
+        "price_warming": price_warmer.get_stats(),
+    }
\ No newline at end of file
@@ -1,35 +1,32 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from app.schemas import ChatRequest, ChatResponse, SessionCreate, SessionResponse
 from app.services.groq_service import groq_service
 from app.services.laptop_service import laptop_service
+from app.services.context_manager import context_manager, RECOMMENDATIONS_HEADER
+from app.services.greeting_pool import greeting_pool
+from app.services.slot_extractor import slot_extractor
+from app.services.session_store import session_store
+from app.services.price_fetcher import price_warmer
+from app.services.conversation import Turn, new_session, build_messages, session_view
 from app.database import get_database
 from app.utils.helpers import generate_session_id, moderation_check
-from datetime import datetime
+from typing import Optional
+import json
+import logging
 
-router = APIRouter(tags=["chat"])
+logger = logging.getLogger(__name__)
 
-# In-memory session storage (in production, use Redis or MongoDB)
-sessions = {}
+router = APIRouter(tags=["chat"])
 
 @router.post("/session", response_model=SessionResponse)
 async def create_session():
     """Create a new chat session"""
     session_id = generate_session_id()
 
-    conversation = groq_service.initialize_conversation()
-    initial_message = groq_service.get_chat_completion(conversation)
-
-    sessions[session_id] = {
-        "conversation": conversation,
-        "user_profile": None,
-        "recommendations": None,
-        "created_at": datetime.utcnow()
-    }
+    initial_message = await greeting_pool.get()
 
-    sessions[session_id]["conversation"].append({
-        "role": "assistant",
-        "content": initial_message
-    })
+    await session_store.put(session_id, new_session(initial_message))
 
     return SessionResponse(session_id=session_id, message=initial_message)
 
@@ -40,7 +37,8 @@ async def send_message(request: ChatRequest):
     session_id = request.session_id
     user_message = request.message
 
-    if session_id not in sessions:
+    session = await session_store.get(session_id)
+    if session is None:
         raise HTTPException(status_code=404, detail="Session not found")
 
     if moderation_check(user_message) == "Flagged":
@@ -50,11 +48,91 @@ async def send_message(request: ChatRequest):
             intent_confirmed=False
         )
 
-    session = sessions[session_id]
-    conversation = session["conversation"]
+    session["conversation"].append(Turn("user", user_message))
+    assistant_response = _local_profile_reply(session, user_message)
+    if assistant_response is None:
+        assistant_response = await groq_service.get_chat_completion(context_manager.build(build_messages(session)))
+
+    response_data = await _complete_turn(session_id, session, assistant_response)
+    await session_store.put(session_id, session)
+    return ChatResponse(**response_data)
+
+
+@router.post("/message/stream")
+async def stream_message(request: ChatRequest):
+    """
+    Streaming variant of /message (Server-Sent Events).
 
-    conversation.append({"role": "user", "content": user_message})
-    assistant_response = groq_service.get_chat_completion(conversation)
+    Emits `token` events as Groq produces them, a `recommendations` event
+    if the turn confirmed a profile, and a final `done` event carrying the
+    same payload /message would have returned.
+    """
+    session_id = request.session_id
+    user_message = request.message
+
+    session = await session_store.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    async def events():
+        if moderation_check(user_message) == "Flagged":
+            yield _sse("done", ChatResponse(
+                session_id=session_id,
+                message="Sorry, this message has been flagged. Please rephrase your message.",
+                intent_confirmed=False
+            ).model_dump())
+            return
+
+        session["conversation"].append(Turn("user", user_message))
+
+        chunks = []
+        local_reply = _local_profile_reply(session, user_message)
+        if local_reply is not None:
+            chunks.append(local_reply)
+            yield _sse("token", {"content": local_reply})
+        else:
+            async for token in groq_service.stream_chat_completion(context_manager.build(build_messages(session))):
+                chunks.append(token)
+                yield _sse("token", {"content": token})
+
+        response_data = await _complete_turn(session_id, session, "".join(chunks))
+        await session_store.put(session_id, session)
+        if response_data.get("recommendations"):
+            yield _sse("recommendations", {
+                "user_profile": response_data["user_profile"],
+                "recommendations": response_data["recommendations"],
+                "message": response_data["message"],
+            })
+        yield _sse("done", ChatResponse(**response_data).model_dump())
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _local_profile_reply(session: dict, user_message: str) -> Optional[str]:
+    """
+    Track slots the user states explicitly, on top of the last profile they
+    confirmed with the LLM; once this message completes all ten, answer
+    with the profile directly instead of another LLM turn.
+    """
+    slots = session.setdefault("slots", dict(session.get("user_profile") or {}))
+    changed = slot_extractor.update(slots, user_message)
+    if changed and slot_extractor.is_complete(slots) and session.get("user_profile") != slots:
+        logger.info(f"All slots extracted locally — skipping LLM turn: {slots}")
+        return slot_extractor.profile_message(slots)
+    return None
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def _complete_turn(session_id: str, session: dict, assistant_response: str) -> dict:
+    """Check the assistant reply for a confirmed profile, attach recommendations and record the turn."""
+    turn = Turn("assistant", assistant_response)
 
     # ✅ FIX 1: intent_confirmation_layer now returns bool directly (pure Python, no LLM)
     intent_confirmed = groq_service.intent_confirmation_layer(assistant_response)
@@ -88,13 +166,19 @@ async def send_message(request: ChatRequest):
                 print(f"✅ Found {len(recommendations)} recommendations")
 
                 session["user_profile"] = user_profile
-                session["recommendations"] = recommendations
+                # Later explicit changes ("make it 90000") build on what was confirmed
+                session["slots"] = dict(user_profile)
+                session["recommendations"] = [laptop['_id'] for laptop in recommendations]
+                # History keeps the names; the rendered block is only for this response
+                turn.recommended = [f"{laptop['brand']} {laptop['model_name']}" for laptop in recommendations[:3]]
+                # Same names the price panel asks for, so a click usually hits the cache
+                price_warmer.enqueue(turn.recommended)
 
                 response_data["user_profile"] = user_profile
                 response_data["recommendations"] = recommendations
 
                 rec_msg = "\n\n" + "="*60 + "\n"
-                rec_msg += "✨ **PERSONALIZED LAPTOP RECOMMENDATIONS** ✨\n"
+                rec_msg += RECOMMENDATIONS_HEADER + "\n"
                 rec_msg += "="*60 + "\n\n"
                 rec_msg += f"Great news! I found **{len(recommendations)} excellent matches** based on your requirements:\n\n"
 
@@ -140,16 +224,24 @@ async def send_message(request: ChatRequest):
                 no_match += "Try adjusting your budget or lowering some requirements to 'medium', and I'll search again!"
                 final_message = assistant_response + no_match
                 response_data["message"] = final_message
+                turn.content = final_message
 
         else:
             print("❌ Failed to parse user profile from dictionary")
 
-    conversation.append({"role": "assistant", "content": final_message})
-    return ChatResponse(**response_data)
+    session["conversation"].append(turn)
+    return response_data
 
 
 @router.get("/session/{session_id}")
 async def get_session(session_id: str):
-    if session_id not in sessions:
+    session = await session_store.get(session_id)
+    if session is None:
         raise HTTPException(status_code=404, detail="Session not found")
-    return sessions[session_id]
\ No newline at end of file
+    view = session_view(session)
+    if session.get("recommendations"):
+        # Stored as IDs; returned as the laptops, like the chat response
+        view["recommendations"] = await laptop_service.get_recommended(
+            session.get("user_profile"), session["recommendations"]
+        )
+    return view
\ No newline at end of file
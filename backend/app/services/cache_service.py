@@ -1,39 +1,107 @@
+import time
+import logging
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+from app.config import get_settings
 from app.database import get_database
 
-CACHE_EXPIRY_HOURS = 6
+logger = logging.getLogger(__name__)
+settings = get_settings()
 
+PRICE_CACHE_COLLECTION = "price_cache"
 
-async def get_cached_prices(laptop_name: str):
-    """Return cached prices if they exist and are not expired."""
-    db = get_database()
-    cache = db["price_cache"]
+def cache_key(laptop_name: str) -> str:
+    """Normalise once per request; every PriceCache method takes the key."""
+    return laptop_name.lower().strip()
 
-    record = await cache.find_one({"laptop_name": laptop_name.lower().strip()})
-    if not record:
-        return None
 
-    age = datetime.utcnow() - record["cached_at"]
-    if age > timedelta(hours=CACHE_EXPIRY_HOURS):
-        await cache.delete_one({"laptop_name": laptop_name.lower().strip()})
-        return None
+class PriceCache:
+    """
+    Scraped prices in two tiers: a small in-process LRU in front of the
+    price_cache collection.
 
-    return record["prices"]
+    Entries younger than fresh_hours are fresh; up to stale_hours beyond
+    that they are still served, flagged stale, so callers can refresh
+    them in the background. Memory entries are kept for memory_ttl seconds
+    so a refresh written by another worker is picked up soon after.
+    """
 
+    def __init__(self, fresh_hours: float, stale_hours: float, memory_entries: int, memory_ttl: float):
+        self.fresh = timedelta(hours=fresh_hours)
+        self.max_age = timedelta(hours=fresh_hours + stale_hours)
+        self.memory_entries = memory_entries
+        self.memory_ttl = memory_ttl
+        self._memory: "OrderedDict[str, Tuple[float, datetime, Dict]]" = OrderedDict()
+        self.stats = {
+            "memory": {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0},
+            "mongo": {"hits": 0, "misses": 0, "writes": 0},
+        }
 
-async def set_cached_prices(laptop_name: str, prices: dict):
-    """Store scraped prices in MongoDB cache."""
-    db = get_database()
-    cache = db["price_cache"]
+    def _collection(self):
+        return get_database()[PRICE_CACHE_COLLECTION]
 
-    await cache.update_one(
-        {"laptop_name": laptop_name.lower().strip()},
-        {
-            "$set": {
-                "laptop_name": laptop_name.lower().strip(),
-                "prices": prices,
-                "cached_at": datetime.utcnow(),
-            }
-        },
-        upsert=True,
-    )
\ No newline at end of file
+    def _remember(self, key: str, cached_at: datetime, prices: Dict) -> None:
+        self._memory[key] = (time.monotonic() + self.memory_ttl, cached_at, prices)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+            self.stats["memory"]["evictions"] += 1
+
+    def _from_memory(self, key: str) -> Optional[Tuple[datetime, Dict]]:
+        entry = self._memory.get(key)
+        if entry is None:
+            self.stats["memory"]["misses"] += 1
+            return None
+        expires_at, cached_at, prices = entry
+        if expires_at < time.monotonic() or datetime.utcnow() - cached_at > self.max_age:
+            del self._memory[key]
+            self.stats["memory"]["expirations"] += 1
+            self.stats["memory"]["misses"] += 1
+            return None
+        self._memory.move_to_end(key)
+        self.stats["memory"]["hits"] += 1
+        return cached_at, prices
+
+    async def get(self, key: str) -> Optional[Tuple[Dict, bool]]:
+        """Return (prices, is_stale), or None if missing or too old to serve."""
+        entry = self._from_memory(key)
+        if entry is None:
+            # The TTL monitor runs about once a minute, so filter on age too
+            record = await self._collection().find_one(
+                {"laptop_name": key, "cached_at": {"$gt": datetime.utcnow() - self.max_age}},
+                {"prices": 1, "cached_at": 1},
+            )
+            if record is None:
+                self.stats["mongo"]["misses"] += 1
+                return None
+            self.stats["mongo"]["hits"] += 1
+            entry = record["cached_at"], record["prices"]
+            self._remember(key, *entry)
+
+        cached_at, prices = entry
+        return prices, datetime.utcnow() - cached_at > self.fresh
+
+    async def set(self, key: str, prices: Dict) -> None:
+        cached_at = datetime.utcnow()
+        self._remember(key, cached_at, prices)
+        await self._collection().update_one(
+            {"laptop_name": key},
+            {"$set": {"laptop_name": key, "prices": prices, "cached_at": cached_at}},
+            upsert=True,
+        )
+        self.stats["mongo"]["writes"] += 1
+
+    def get_stats(self) -> Dict:
+        return {
+            "memory": {**self.stats["memory"], "size": len(self._memory), "max_entries": self.memory_entries},
+            "mongo": dict(self.stats["mongo"]),
+        }
+
+
+price_cache = PriceCache(
+    fresh_hours=settings.price_cache_fresh_hours,
+    stale_hours=settings.price_cache_stale_hours,
+    memory_entries=settings.price_cache_memory_entries,
+    memory_ttl=settings.price_cache_memory_ttl,
+)
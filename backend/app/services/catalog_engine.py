@@ -0,0 +1,147 @@
+import re
+import logging
+from typing import List, Dict, Optional, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+LEVELS = {'low': 0, 'medium': 1, 'high': 2}
+SCOREABLE_FEATURES = [
+    'gpu intensity', 'processing speed', 'ram capacity',
+    'storage capacity', 'storage type', 'display quality',
+    'display size', 'portability', 'battery life'
+]
+TOP_K = 3
+
+# Laptops whose price can't be parsed never fall inside a budget
+UNPRICED = np.iinfo(np.int64).max
+
+
+def parse_price(value) -> Optional[int]:
+    """Parse a stored price like 35000 or "35,000" — None if unparseable."""
+    try:
+        return int(str(value).replace(',', ''))
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_budget(user_req: Dict) -> int:
+    """Strip everything except digits from the profile's budget."""
+    digits = re.sub(r'[^\d]', '', str(user_req.get('budget', '0')))
+    return int(digits) if digits else 0
+
+
+def user_levels(user_req: Dict) -> np.ndarray:
+    """Encode the nine profile levels as a uint8 vector (unknown → low)."""
+    return np.array(
+        [LEVELS.get(str(user_req.get(f, 'low')).lower(), 0) for f in SCOREABLE_FEATURES],
+        dtype=np.uint8,
+    )
+
+
+class CatalogEngine:
+    """
+    Columnar view of the catalog used to score user profiles.
+
+    features:     (n, 9) uint8 matrix of laptop_feature levels
+    has_features: (n,) bool — laptops without laptop_feature always score 0
+    prices:       (n,) int64 price vector (price_inr)
+    """
+
+    def __init__(self, laptops: List[Dict], features: np.ndarray,
+                 has_features: np.ndarray, prices: np.ndarray):
+        self.laptops = laptops
+        self.features = features
+        self.has_features = has_features
+        self.prices = prices
+        self._price_points: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_laptops(cls, laptops: List[Dict]) -> "CatalogEngine":
+        n = len(laptops)
+        features = np.zeros((n, len(SCOREABLE_FEATURES)), dtype=np.uint8)
+        has_features = np.zeros(n, dtype=bool)
+        prices = np.full(n, UNPRICED, dtype=np.int64)
+
+        for i, laptop in enumerate(laptops):
+            # price_inr is parsed at ingest; older documents only have price
+            price = laptop['price_inr'] if 'price_inr' in laptop else parse_price(laptop.get('price'))
+            if price is not None:
+                prices[i] = price
+
+            laptop_feature = laptop.get('laptop_feature')
+            if not laptop_feature or not isinstance(laptop_feature, dict):
+                continue
+            has_features[i] = True
+            for j, feature in enumerate(SCOREABLE_FEATURES):
+                level = str(laptop_feature.get(feature, 'low')).lower()
+                features[i, j] = LEVELS.get(level, 0)
+
+        return cls(laptops, features, has_features, prices)
+
+    def __len__(self) -> int:
+        return len(self.laptops)
+
+    def laptop(self, i: int) -> Dict:
+        """Return the catalog document for row i."""
+        return self.laptops[i]
+
+    def price_breakpoint(self, budget: int) -> int:
+        """
+        Highest catalog price ≤ budget (-1 if none). All budgets with the
+        same breakpoint select exactly the same laptops.
+        """
+        if self._price_points is None:
+            self._price_points = np.unique(self.prices[self.prices != UNPRICED])
+        pos = int(np.searchsorted(self._price_points, budget, side='right'))
+        return int(self._price_points[pos - 1]) if pos else -1
+
+    def scores(self, levels: np.ndarray) -> np.ndarray:
+        """Score every laptop against a profile: count of features ≥ required level."""
+        matched = (self.features >= levels).sum(axis=1, dtype=np.int16)
+        return np.where(self.has_features, matched, 0).astype(np.int16)
+
+    def rank(self, user_req: Dict, budget: int, k: int = TOP_K) -> Tuple[List[Dict], int]:
+        """
+        Return (top k laptops within budget, number of laptops within budget).
+        Ties keep catalog order, matching the stable sort of the old loop.
+        """
+        idx = np.flatnonzero(self.prices <= budget)
+        within_budget = int(idx.size)
+        if within_budget == 0:
+            return [], 0
+
+        levels = user_levels(user_req)
+        scores = self.scores(levels)[idx]
+
+        if idx.size > k:
+            # Keep everything strictly above the k-th best score, then fill
+            # with the earliest rows tied at that score.
+            kth = np.partition(scores, -k)[-k]
+            above = scores > kth
+            tied = np.flatnonzero(scores == kth)[:k - int(above.sum())]
+            keep = np.concatenate([np.flatnonzero(above), tied])
+            idx, scores = idx[keep], scores[keep]
+
+        order = np.lexsort((idx, -scores))[:k]
+        top = [self._result(int(idx[o]), int(scores[o]), user_req) for o in order]
+        return top, within_budget
+
+    def _result(self, i: int, score: int, user_req: Dict) -> Dict:
+        """Copy a catalog row and attach score + match_details for display."""
+        laptop = dict(self.laptop(i))
+        match_details = {}
+
+        if self.has_features[i]:
+            laptop_feature = laptop['laptop_feature']
+            for feature in SCOREABLE_FEATURES:
+                user_val = str(user_req.get(feature, 'low')).lower()
+                laptop_val = str(laptop_feature.get(feature, 'low')).lower()
+                if LEVELS.get(laptop_val, 0) >= LEVELS.get(user_val, 0):
+                    match_details[feature] = f"✅ {laptop_val} (need: {user_val})"
+                else:
+                    match_details[feature] = f"❌ {laptop_val} (need: {user_val})"
+
+        laptop['score'] = score
+        laptop['match_details'] = match_details
+        return laptop
@@ -0,0 +1,125 @@
+import os
+import json
+import struct
+import logging
+from typing import Dict, List, Tuple
+import numpy as np
+from app.services.catalog_engine import CatalogEngine, SCOREABLE_FEATURES, UNPRICED
+
+logger = logging.getLogger(__name__)
+
+# File layout (little-endian, sections 8-byte aligned):
+#   header        magic, source_version, n, n_features, n_price_points, blob_len
+#   features      (n, n_features) uint8
+#   has_features  (n,) uint8
+#   prices        (n,) int64
+#   price_points  (n_price_points,) int64 — sorted unique prices
+#   offsets       (n + 1,) uint64 — document i is blob[offsets[i]:offsets[i+1]]
+#   blob          UTF-8 JSON documents, back to back
+MAGIC = b"LAPCAT01"
+HEADER = struct.Struct("<8sqQIQQ")
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _layout(n: int, n_features: int, n_points: int) -> Dict[str, Tuple[int, int]]:
+    """Byte (offset, length) of each section."""
+    sections = {}
+    offset = HEADER.size
+    for name, size in (
+        ("features", n * n_features),
+        ("has_features", n),
+        ("prices", n * 8),
+        ("price_points", n_points * 8),
+        ("offsets", (n + 1) * 8),
+    ):
+        offset = _align(offset)
+        sections[name] = (offset, size)
+        offset += size
+    sections["blob"] = (_align(offset), 0)
+    return sections
+
+
+def write_catalog_file(path: str, laptops: List[Dict], source_version: int) -> int:
+    """
+    Write laptops (snapshot docs, string _id) as a columnar catalog file.
+    The file is replaced atomically so running workers keep their mapping.
+    Returns the file size in bytes.
+    """
+    engine = CatalogEngine.from_laptops(laptops)
+    price_points = np.unique(engine.prices[engine.prices != UNPRICED])
+
+    docs = [json.dumps(doc, default=str, separators=(",", ":")).encode() for doc in laptops]
+    offsets = np.zeros(len(docs) + 1, dtype="<u8")
+    offsets[1:] = np.cumsum([len(d) for d in docs])
+
+    n, k = engine.features.shape
+    sections = _layout(n, k, len(price_points))
+    arrays = {
+        "features": np.ascontiguousarray(engine.features, dtype=np.uint8),
+        "has_features": engine.has_features.astype(np.uint8),
+        "prices": engine.prices.astype("<i8"),
+        "price_points": price_points.astype("<i8"),
+        "offsets": offsets,
+    }
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, source_version, n, k, len(price_points), int(offsets[-1])))
+        for name, array in arrays.items():
+            f.seek(sections[name][0])
+            f.write(array.tobytes())
+        f.seek(sections["blob"][0])
+        for doc in docs:
+            f.write(doc)
+    os.replace(tmp_path, path)
+    return os.path.getsize(path)
+
+
+class MappedCatalogEngine(CatalogEngine):
+    """
+    CatalogEngine over a memory-mapped catalog file.
+
+    Score columns are views into the mapping — nothing is parsed at load,
+    and every worker mapping the same file shares its pages. Documents are
+    decoded from the blob only for the laptops actually returned.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._map = np.memmap(path, dtype=np.uint8, mode="r")
+        magic, self.source_version, n, k, n_points, _ = HEADER.unpack(bytes(self._map[:HEADER.size]))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a catalog file")
+        if k != len(SCOREABLE_FEATURES):
+            raise ValueError(f"{path} has {k} feature columns, expected {len(SCOREABLE_FEATURES)}")
+
+        sections = _layout(n, k, n_points)
+
+        def section(name: str, dtype) -> np.ndarray:
+            offset, size = sections[name]
+            return self._map[offset:offset + size].view(dtype)
+
+        # Documents live in the blob, not a list — see laptop()
+        super().__init__(
+            laptops=[],
+            features=section("features", np.uint8).reshape(n, k),
+            has_features=section("has_features", np.bool_),
+            prices=section("prices", "<i8"),
+        )
+        self._price_points = section("price_points", "<i8")
+        self._offsets = section("offsets", "<u8")
+        self._blob = sections["blob"][0]
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def laptop(self, i: int) -> Dict:
+        start, end = int(self._offsets[i]), int(self._offsets[i + 1])
+        return json.loads(bytes(self._map[self._blob + start:self._blob + end]))
+
+    def documents(self) -> List[Dict]:
+        """Decode every document (used when switching to live updates)."""
+        return [self.laptop(i) for i in range(len(self))]
@@ -0,0 +1,238 @@
+import os
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+from pymongo.errors import OperationFailure, PyMongoError
+from app.config import get_settings
+from app.database import get_database
+from app.services.catalog_engine import CatalogEngine
+from app.services.catalog_file import MappedCatalogEngine
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Writers (seed_data.py, generate_laptop_features.py) bump this counter so
+# deployments without change streams (standalone mongod) can still notice edits.
+CATALOG_META_COLLECTION = "catalog_meta"
+CATALOG_VERSION_ID = "laptops"
+
+# Long free-text fields the recommendation path never reads
+SNAPSHOT_PROJECTION = {'description': 0}
+
+CHANGE_STREAMS_UNSUPPORTED = 40573  # "$changeStream stage is only supported on replica sets"
+
+
+async def bump_catalog_version(db) -> None:
+    """Record that the laptops collection changed."""
+    await db[CATALOG_META_COLLECTION].update_one(
+        {'_id': CATALOG_VERSION_ID}, {'$inc': {'version': 1}}, upsert=True
+    )
+
+
+async def get_catalog_version(db) -> int:
+    record = await db[CATALOG_META_COLLECTION].find_one({'_id': CATALOG_VERSION_ID})
+    return record.get('version', 0) if record else 0
+
+
+def _snapshot_doc(doc: Dict) -> Dict:
+    doc = {k: v for k, v in doc.items() if k not in SNAPSHOT_PROJECTION}
+    doc['_id'] = str(doc['_id'])
+    return doc
+
+
+class CatalogSnapshot:
+    """
+    Process-wide copy of the laptops collection, loaded once at startup.
+
+    Kept fresh from a change stream on `laptops`; falls back to polling
+    the catalog_meta version counter when change streams are unavailable.
+    `version` increments on every applied refresh so callers can key
+    derived caches on it.
+
+    If an exported catalog file (settings.catalog_snapshot_path) exists it
+    is memory-mapped and served immediately at startup; MongoDB is only
+    read in the background when the file's catalog version is out of date.
+    """
+
+    def __init__(self):
+        # None while serving straight from the mapped file
+        self._laptops: Optional[Dict[str, Dict]] = {}
+        self.engine: Optional[CatalogEngine] = None
+        self.version = 0
+        self.source_version: Optional[int] = None
+        self.mode = "idle"
+        self.file_path: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loaded = asyncio.Event()
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "full_loads": 0,
+            "file_loads": 0,
+            "incremental_updates": 0,
+            "last_refresh": None,
+        }
+
+    @property
+    def ready(self) -> bool:
+        return self.engine is not None
+
+    def get_engine(self) -> Optional[CatalogEngine]:
+        """Return the current engine, or None if the snapshot isn't loaded."""
+        if self.engine is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return self.engine
+
+    async def load(self) -> None:
+        """Full (re)load of the catalog from MongoDB."""
+        db = get_database()
+        source_version = await get_catalog_version(db)
+        docs = await db.laptops.find({}, SNAPSHOT_PROJECTION).to_list(length=None)
+        self._laptops = {str(d['_id']): _snapshot_doc(d) for d in docs}
+        self.source_version = source_version
+        self.stats["full_loads"] += 1
+        self._rebuild()
+        logger.info(f"Catalog snapshot loaded: {len(self._laptops)} laptops (source version {source_version})")
+
+    def load_file(self, path: str) -> bool:
+        """Serve from an exported catalog file; False if it's missing or unreadable."""
+        if not path or not os.path.exists(path):
+            return False
+        try:
+            engine = MappedCatalogEngine(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring catalog file {path}: {e}")
+            return False
+        self.engine = engine
+        self._laptops = None
+        self.source_version = engine.source_version
+        self.file_path = path
+        self.version += 1
+        self.stats["file_loads"] += 1
+        self.stats["last_refresh"] = datetime.utcnow()
+        logger.info(f"Catalog snapshot mapped from {path}: {len(engine)} laptops (source version {engine.source_version})")
+        return True
+
+    async def _file_is_current(self, db) -> bool:
+        return self._laptops is None and await get_catalog_version(db) == self.source_version
+
+    def _documents(self) -> Dict[str, Dict]:
+        if self._laptops is None:
+            # First live change on top of the mapped file
+            self._laptops = {d['_id']: d for d in self.engine.documents()}
+        return self._laptops
+
+    def _rebuild(self) -> None:
+        self.engine = CatalogEngine.from_laptops(list(self._documents().values()))
+        self.version += 1
+        self.stats["last_refresh"] = datetime.utcnow()
+
+    def _apply_change(self, change: Dict) -> None:
+        laptops = self._documents()
+        op = change.get("operationType")
+        if op in ("insert", "update", "replace"):
+            doc = change.get("fullDocument")
+            if doc is None:  # deleted again before the lookup ran
+                laptops.pop(str(change["documentKey"]["_id"]), None)
+            else:
+                laptops[str(doc['_id'])] = _snapshot_doc(doc)
+        elif op == "delete":
+            laptops.pop(str(change["documentKey"]["_id"]), None)
+        elif op in ("drop", "rename", "dropDatabase", "invalidate"):
+            laptops.clear()
+        self.stats["incremental_updates"] += 1
+
+    async def start(self) -> None:
+        """Begin watching and wait for the first load (or its failure)."""
+        self._loaded = asyncio.Event()
+        if self.load_file(settings.catalog_snapshot_path):
+            # Requests are served from the file while MongoDB catches up
+            self._loaded.set()
+        self._task = asyncio.create_task(self._watch())
+
+        # Also wake up if the watcher dies before loading, and surface its error
+        loaded = asyncio.create_task(self._loaded.wait())
+        done, _ = await asyncio.wait({loaded, self._task}, return_when=asyncio.FIRST_COMPLETED)
+        if loaded not in done:
+            loaded.cancel()
+            self._task.result()
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.mode = "idle"
+
+    async def _watch(self) -> None:
+        try:
+            await self._watch_forever()
+        except Exception:
+            # Anything but a MongoDB error is a bug; don't let it vanish with the task
+            logger.exception("Catalog watcher crashed — the snapshot is no longer updated")
+            raise
+
+    async def _watch_forever(self) -> None:
+        while True:
+            try:
+                await self._watch_change_stream()
+                logger.info("Catalog change stream closed — reopening")
+            except PyMongoError as e:
+                if isinstance(e, OperationFailure) and e.code == CHANGE_STREAMS_UNSUPPORTED:
+                    logger.info("Change streams unavailable — polling catalog version instead")
+                    await self._poll_version()
+                    return
+                # Don't hold up startup; requests fall back to MongoDB meanwhile
+                logger.warning(f"Catalog change stream interrupted: {e}")
+                self._loaded.set()
+                await asyncio.sleep(settings.catalog_poll_interval)
+
+    async def _watch_change_stream(self) -> None:
+        db = get_database()
+        async with db.laptops.watch(full_document="updateLookup") as stream:
+            self.mode = "change_stream"
+            # Load only once the stream is open so no write slips between the two
+            if await self._file_is_current(db):
+                logger.info("Catalog file is up to date — skipping the full load")
+            else:
+                await self.load()
+            self._loaded.set()
+            while stream.alive:
+                change = await stream.next()
+                self._apply_change(change)
+                # Drain whatever else is already buffered so a bulk write
+                # rebuilds the engine once, not once per document.
+                while (change := await stream.try_next()) is not None:
+                    self._apply_change(change)
+                self._rebuild()
+
+    async def _poll_version(self) -> None:
+        self.mode = "polling"
+        db = get_database()
+        while True:
+            try:
+                if self.engine is None or await get_catalog_version(db) != self.source_version:
+                    await self.load()
+            except PyMongoError as e:
+                logger.warning(f"Catalog version poll failed: {e}")
+            self._loaded.set()
+            await asyncio.sleep(settings.catalog_poll_interval)
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            "mode": self.mode,
+            "laptops": len(self.engine) if self.engine is not None else 0,
+            "file": self.file_path if self._laptops is None else None,
+            "version": self.version,
+            "source_version": self.source_version,
+        }
+
+
+catalog_snapshot = CatalogSnapshot()
@@ -0,0 +1,107 @@
+import re
+import logging
+from typing import List, Dict, Tuple
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# routes/chat.py renders recommendations under this header; the block is
+# for the user's eyes only and is replaced by a one-line note for the LLM.
+RECOMMENDATIONS_HEADER = "✨ **PERSONALIZED LAPTOP RECOMMENDATIONS** ✨"
+REC_BLOCK_RE = re.compile(r"\n*=+\n" + re.escape(RECOMMENDATIONS_HEADER) + r".*", re.DOTALL)
+REC_NAME_RE = re.compile(r"\*\*🏆 RECOMMENDATION #\d+\*\*\n─+\n\n\*\*(.+?)\*\*")
+PROFILE_RE = re.compile(r"\{[^{}]+\}", re.DOTALL)
+
+SUMMARY_SNIPPET_CHARS = 300  # per dropped user turn
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 chars/token) — good enough for budgeting."""
+    return len(text) // 4 + 4
+
+
+def recommendation_note(names: List[str]) -> str:
+    """What the LLM sees in place of a rendered recommendations block."""
+    return f"\n\n[Recommended to the user: {', '.join(names)}]" if names else ""
+
+
+def strip_recommendations(content: str) -> str:
+    """Replace a rendered recommendations block with the laptop names it listed."""
+    match = REC_BLOCK_RE.search(content)
+    if not match:
+        return content
+    return content[:match.start()] + recommendation_note(REC_NAME_RE.findall(match.group()))
+
+
+class ContextManager:
+    """
+    Builds the message list sent to Groq for a chat turn.
+
+    Rendered recommendation blocks are stripped from history, and when the
+    conversation exceeds the token budget the oldest turns are folded into
+    a short summary that keeps what the user already told us.
+    """
+
+    def __init__(self, token_budget: int, keep_recent: int):
+        self.token_budget = token_budget
+        self.keep_recent = keep_recent
+        self.stats = {"requests": 0, "compacted": 0, "turns_dropped": 0, "tokens_saved": 0}
+
+    def build(self, conversation: List[Dict]) -> List[Dict]:
+        messages, saved = self.compact(conversation)
+        self.stats["requests"] += 1
+        if saved:
+            self.stats["tokens_saved"] += saved
+            logger.info(f"Context compacted: saved ~{saved} tokens ({len(conversation)} → {len(messages)} messages)")
+        return messages
+
+    def compact(self, conversation: List[Dict]) -> Tuple[List[Dict], int]:
+        """Return (messages to send, estimated tokens saved)."""
+        original = sum(estimate_tokens(m["content"]) for m in conversation)
+
+        system = [m for m in conversation[:1] if m["role"] == "system"]
+        turns = [
+            {"role": m["role"], "content": strip_recommendations(m["content"]) if m["role"] == "assistant" else m["content"]}
+            for m in conversation[len(system):]
+        ]
+
+        def total(msgs):
+            return sum(estimate_tokens(m["content"]) for m in msgs)
+
+        messages = system + turns
+        if total(messages) > self.token_budget and len(turns) > self.keep_recent:
+            dropped = []
+            while len(turns) > self.keep_recent:
+                dropped.append(turns.pop(0))
+                messages = system + [self._summary(dropped)] + turns
+                if total(messages) <= self.token_budget:
+                    break
+            # Never open the kept window on an assistant turn
+            while turns and turns[0]["role"] == "assistant" and len(turns) > 1:
+                dropped.append(turns.pop(0))
+                messages = system + [self._summary(dropped)] + turns
+            self.stats["compacted"] += 1
+            self.stats["turns_dropped"] += len(dropped)
+
+        return messages, max(original - total(messages), 0)
+
+    def _summary(self, dropped: List[Dict]) -> Dict:
+        lines = ["Summary of the earlier conversation (already collected — do not ask again):"]
+        for m in dropped:
+            if m["role"] == "user":
+                lines.append(f"- User said: {m['content'][:SUMMARY_SNIPPET_CHARS]}")
+            else:
+                profile = PROFILE_RE.search(m["content"])
+                if profile:
+                    lines.append(f"- Confirmed profile: {profile.group()}")
+        return {"role": "system", "content": "\n".join(lines)}
+
+    def get_stats(self) -> Dict:
+        return dict(self.stats)
+
+
+context_manager = ContextManager(
+    token_budget=settings.context_token_budget,
+    keep_recent=settings.context_keep_recent_turns,
+)
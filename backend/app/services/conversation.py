@@ -0,0 +1,62 @@
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional
+from app.services.groq_service import SYSTEM_PROMPT_ID, SYSTEM_PROMPTS
+from app.services.context_manager import recommendation_note
+
+
+class Turn:
+    """
+    One user or assistant message in a session.
+
+    Assistant turns that showed recommendations keep only the laptop names
+    (`recommended`), not the rendered markdown — the LLM never sees the
+    rendered block anyway (see context_manager.strip_recommendations).
+    """
+
+    __slots__ = ("role", "content", "recommended")
+
+    def __init__(self, role: str, content: str, recommended: Optional[List[str]] = None):
+        # Interned: every turn loaded from MongoDB shares one "user"/"assistant" string
+        self.role = sys.intern(role)
+        self.content = content
+        self.recommended = recommended
+
+    def to_message(self) -> Dict:
+        content = self.content
+        if self.recommended:
+            content += recommendation_note(self.recommended)
+        return {"role": self.role, "content": content}
+
+    def to_record(self) -> List:
+        """Compact JSON/BSON form: [role, content] or [role, content, names]."""
+        record = [self.role, self.content]
+        if self.recommended:
+            record.append(self.recommended)
+        return record
+
+    @classmethod
+    def from_record(cls, record: List) -> "Turn":
+        return cls(*record)
+
+
+def new_session(greeting: str) -> Dict:
+    return {
+        "system_prompt": SYSTEM_PROMPT_ID,
+        "conversation": [Turn("assistant", greeting)],
+        "user_profile": None,
+        "recommendations": None,  # laptop IDs, best first
+        "slots": {},
+        "created_at": datetime.utcnow()
+    }
+
+
+def build_messages(session: Dict) -> List[Dict]:
+    """Full message list (system prompt + turns) — built only when calling the LLM."""
+    system_prompt = SYSTEM_PROMPTS.get(session.get("system_prompt"), SYSTEM_PROMPTS[SYSTEM_PROMPT_ID])
+    return [{"role": "system", "content": system_prompt}] + [t.to_message() for t in session["conversation"]]
+
+
+def session_view(session: Dict) -> Dict:
+    """Session as returned by the API, with the conversation expanded."""
+    return {**session, "conversation": build_messages(session)}
@@ -0,0 +1,90 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Dict, Optional
+from app.config import get_settings
+from app.services.groq_service import groq_service
+from app.services.groq_scheduler import INTERACTIVE, BATCH
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Served when the pool is empty and Groq is slow or down
+STATIC_GREETING = (
+    "Hi there! 👋 I'm your laptop advisor, and I'll help you find the right laptop.\n\n"
+    "What will you mainly use it for — studies, office work, coding, gaming, or creative work "
+    "like photo/video editing? And do you have a budget in mind?"
+)
+
+
+class GreetingPool:
+    """
+    Pre-generated opening messages for new sessions.
+
+    Every session starts from the same system prompt, so greetings are
+    generated ahead of time in the background and handed out instantly;
+    the pool is topped up asynchronously as it drains.
+    """
+
+    def __init__(self, size: int, timeout: float):
+        self.size = size
+        self.timeout = timeout
+        self._greetings: deque = deque()
+        self._refill_task: Optional[asyncio.Task] = None
+        self.stats = {"pooled": 0, "live": 0, "static": 0, "generated": 0, "failures": 0}
+
+    async def start(self) -> None:
+        self._schedule_refill()
+
+    async def stop(self) -> None:
+        if self._refill_task and not self._refill_task.done():
+            self._refill_task.cancel()
+            try:
+                await self._refill_task
+            except asyncio.CancelledError:
+                pass
+
+    def _schedule_refill(self) -> None:
+        if self._refill_task is None or self._refill_task.done():
+            self._refill_task = asyncio.create_task(self._refill())
+
+    async def _generate(self, priority: int) -> str:
+        return await groq_service.get_chat_completion(groq_service.initialize_conversation(), priority=priority)
+
+    async def _refill(self) -> None:
+        while len(self._greetings) < self.size:
+            # Background top-ups must not compete with live chats for quota
+            greeting = await self._generate(BATCH)
+            if not greeting:
+                # Groq is failing — try again on the next drain, not in a tight loop
+                self.stats["failures"] += 1
+                return
+            self._greetings.append(greeting)
+            self.stats["generated"] += 1
+
+    async def get(self) -> str:
+        """Return a greeting without waiting on the LLM when possible."""
+        if self._greetings:
+            self.stats["pooled"] += 1
+            greeting = self._greetings.popleft()
+            self._schedule_refill()
+            return greeting
+
+        self._schedule_refill()
+        try:
+            greeting = await asyncio.wait_for(self._generate(INTERACTIVE), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Greeting generation exceeded {self.timeout}s — using static greeting")
+            greeting = ""
+        if greeting:
+            self.stats["live"] += 1
+            return greeting
+
+        self.stats["static"] += 1
+        return STATIC_GREETING
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, "available": len(self._greetings)}
+
+
+greeting_pool = GreetingPool(size=settings.greeting_pool_size, timeout=settings.greeting_timeout)
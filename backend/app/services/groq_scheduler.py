@@ -0,0 +1,239 @@
+import re
+import time
+import heapq
+import random
+import asyncio
+import itertools
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, List, Optional, TypeVar
+from groq import APIConnectionError, APIStatusError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Lower value = served first
+INTERACTIVE = 0
+BATCH = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch"}
+
+WINDOW_SECONDS = 60.0
+DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Parse Groq reset/retry headers like '7.66s', '2m59.56s', '120ms' or '3'."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = DURATION_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(n) * DURATION_UNITS[unit] for n, unit in parts)
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return isinstance(error, APIConnectionError)  # includes timeouts
+
+
+class Ticket:
+    """An admitted call; `tokens` can be corrected once real usage is known."""
+
+    def __init__(self, tokens: int):
+        self.admitted_at = time.monotonic()
+        self.tokens = tokens
+
+
+class GroqScheduler:
+    """
+    Admission control for every Groq call made with our API key.
+
+    Calls wait in a priority queue (interactive ahead of batch) until a
+    concurrency slot and the requests/tokens-per-minute budgets allow them.
+    Budgets are tracked locally over a sliding minute and tightened from
+    Groq's x-ratelimit-* headers; batch calls leave `batch_reserve` of each
+    budget free for live users. 429/5xx responses are retried with
+    jittered exponential backoff, honouring retry-after.
+    """
+
+    def __init__(self, rpm: int, tpm: int, max_concurrency: int,
+                 max_retries: int, batch_reserve: float, base_backoff: float = 1.0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.batch_reserve = batch_reserve
+        self.base_backoff = base_backoff
+
+        self._queue: List[tuple] = []
+        self._seq = itertools.count()
+        self._cond = asyncio.Condition()
+        self._active = 0
+        self._recent: deque = deque()  # admitted tickets in the last minute
+        self._blocked_until = 0.0      # set from retry-after / exhausted headers
+        self._server_remaining: Dict[str, Optional[int]] = {"requests": None, "tokens": None}
+
+        self.stats = {
+            "admitted": {name: 0 for name in PRIORITY_NAMES.values()},
+            "retries": 0,
+            "rate_limited": 0,
+            "failures": 0,
+            "wait_seconds": 0.0,
+        }
+
+    # ── budgets ────────────────────────────────────────────────────────────
+
+    def _prune(self, now: float) -> None:
+        while self._recent and now - self._recent[0].admitted_at >= WINDOW_SECONDS:
+            self._recent.popleft()
+
+    def _budget_wait(self, priority: int, tokens: int, now: float) -> float:
+        """Seconds until a call of this size fits the budget (0 = now)."""
+        if self._blocked_until > now:
+            return self._blocked_until - now
+        self._prune(now)
+
+        share = 1.0 - self.batch_reserve if priority == BATCH else 1.0
+        rpm_limit = max(int(self.rpm * share), 1)
+        tpm_limit = max(int(self.tpm * share), tokens)
+
+        wait = 0.0
+        if len(self._recent) >= rpm_limit:
+            oldest = self._recent[len(self._recent) - rpm_limit]
+            wait = max(wait, oldest.admitted_at + WINDOW_SECONDS - now)
+
+        used = sum(t.tokens for t in self._recent)
+        if used + tokens > tpm_limit:
+            # Wait until enough of the window expires to make room
+            for ticket in self._recent:
+                used -= ticket.tokens
+                if used + tokens <= tpm_limit:
+                    wait = max(wait, ticket.admitted_at + WINDOW_SECONDS - now)
+                    break
+        return wait
+
+    def observe_headers(self, headers) -> None:
+        """Tighten local budgets from Groq's x-ratelimit-* response headers."""
+        if not headers:
+            return
+        now = time.monotonic()
+        for kind in ("requests", "tokens"):
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            if remaining is None:
+                continue
+            try:
+                self._server_remaining[kind] = int(float(remaining))
+            except ValueError:
+                continue
+            if self._server_remaining[kind] <= 0:
+                reset = parse_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+                if reset:
+                    self._blocked_until = max(self._blocked_until, now + reset)
+
+    # ── admission ──────────────────────────────────────────────────────────
+
+    @asynccontextmanager
+    async def slot(self, priority: int = INTERACTIVE, tokens: int = 0):
+        """Hold a concurrency slot and budget share for one Groq call."""
+        ticket = await self._acquire(priority, tokens)
+        try:
+            yield ticket
+        finally:
+            async with self._cond:
+                self._active -= 1
+                self._cond.notify_all()
+
+    async def _acquire(self, priority: int, tokens: int) -> Ticket:
+        entry = (priority, next(self._seq))
+        started = time.monotonic()
+        async with self._cond:
+            heapq.heappush(self._queue, entry)
+            try:
+                while True:
+                    timeout = None
+                    if self._queue[0] == entry and self._active < self.max_concurrency:
+                        now = time.monotonic()
+                        timeout = self._budget_wait(priority, tokens, now)
+                        if timeout <= 0:
+                            heapq.heappop(self._queue)
+                            self._active += 1
+                            ticket = Ticket(tokens)
+                            self._recent.append(ticket)
+                            self.stats["admitted"][PRIORITY_NAMES.get(priority, "batch")] += 1
+                            self.stats["wait_seconds"] += now - started
+                            # The next waiter may be admissible too
+                            self._cond.notify_all()
+                            return ticket
+                    try:
+                        await asyncio.wait_for(self._cond.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+            except BaseException:
+                if entry in self._queue:
+                    self._queue.remove(entry)
+                    heapq.heapify(self._queue)
+                    self._cond.notify_all()
+                raise
+
+    async def run(self, call: Callable[[Ticket], Awaitable[T]],
+                  priority: int = INTERACTIVE, tokens: int = 0) -> T:
+        """Run call(ticket) under admission control, retrying 429/5xx."""
+        attempt = 0
+        while True:
+            try:
+                async with self.slot(priority, tokens) as ticket:
+                    return await call(ticket)
+            except Exception as e:
+                attempt += 1
+                delay = self.retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+
+    def retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """Backoff before retry number `attempt`, or None if the error is final."""
+        if not is_retryable(error) or attempt > self.max_retries:
+            self.stats["failures"] += 1
+            return None
+        self.stats["retries"] += 1
+        delay = self._backoff(error, attempt)
+        logger.warning(f"Groq call failed ({error.__class__.__name__}), retry {attempt}/{self.max_retries} in {delay:.1f}s")
+        return delay
+
+    def _backoff(self, error: Exception, attempt: int) -> float:
+        delay = self.base_backoff * (2 ** (attempt - 1))
+        delay = random.uniform(delay / 2, delay * 1.5)  # jitter so retries don't sync up
+        response = getattr(error, "response", None)
+        if isinstance(error, APIStatusError) and error.status_code == 429:
+            self.stats["rate_limited"] += 1
+            retry_after = parse_duration(response.headers.get("retry-after")) if response is not None else None
+            if retry_after:
+                delay = max(delay, retry_after)
+                # Everyone waits, not just this caller
+                self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+        return delay
+
+    def get_stats(self) -> Dict:
+        now = time.monotonic()
+        self._prune(now)
+        depth = {name: 0 for name in PRIORITY_NAMES.values()}
+        for priority, _ in self._queue:
+            depth[PRIORITY_NAMES.get(priority, "batch")] += 1
+        return {
+            **self.stats,
+            "wait_seconds": round(self.stats["wait_seconds"], 2),
+            "queue_depth": depth,
+            "active": self._active,
+            "requests_last_minute": len(self._recent),
+            "tokens_last_minute": sum(t.tokens for t in self._recent),
+            "server_remaining": dict(self._server_remaining),
+            "blocked_for": round(max(self._blocked_until - now, 0.0), 2),
+        }
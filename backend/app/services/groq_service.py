@@ -1,8 +1,11 @@
 import re
 import ast
-from groq import Groq
+import asyncio
+import httpx
+from groq import AsyncGroq
+from app.services.groq_scheduler import GroqScheduler, INTERACTIVE
 from app.config import get_settings
-from typing import List, Dict, Optional
+from typing import AsyncIterator, List, Dict, Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -14,6 +17,7 @@ REQUIRED_KEYS = [
     'Display size', 'Portability', 'Battery life', 'Budget'
 ]
 VALID_VALUES = {'low', 'medium', 'high'}
+MAX_TOKENS = 1000
 
 # Fuzzy map — handles LLM slippage like "medium to high", "moderate", etc.
 FUZZY_MAP = {
@@ -48,37 +52,165 @@ def normalise_value(val: str) -> str:
     return v  # return as-is, will fail validation
 
 
+# Sessions store only the ID of the prompt they started with; bump the ID
+# when changing the prompt so running sessions keep the one they began on.
+SYSTEM_PROMPT_ID = "advisor-v1"
+SYSTEM_PROMPTS = {
+    SYSTEM_PROMPT_ID: """You are a friendly but thorough laptop advisor. Collect all 10 requirements before recommending.
+
+REQUIREMENTS (collect ALL before outputting dictionary):
+1. GPU intensity       → MUST be exactly: low / medium / high
+2. Processing speed    → MUST be exactly: low / medium / high
+3. RAM capacity        → MUST be exactly: low / medium / high
+4. Storage capacity    → MUST be exactly: low / medium / high
+5. Storage type        → MUST be exactly: low / medium / high
+6. Display quality     → MUST be exactly: low / medium / high
+7. Display size        → MUST be exactly: low / medium / high
+8. Portability         → MUST be exactly: low / medium / high
+9. Battery life        → MUST be exactly: low / medium / high
+10. Budget             → number only in INR (e.g. 80000)
+
+⚠️ CRITICAL: Every value in the dictionary MUST be exactly 'low', 'medium', or 'high'.
+NEVER use 'medium to high', 'moderate', 'good', or any other variation.
+If unsure between two levels, pick the higher one.
+
+MAPPING GUIDE:
+- GPU: gaming/ML/3D/video editing=high, photo editing/light gaming=medium, basic use=low
+- Processing: i7+/Ryzen7+/heavy workloads=high, i5/Ryzen5/coding/multitasking=medium, i3/basic=low
+- RAM: 32GB+=high, 16GB=medium, 8GB=low
+- Storage capacity: >1TB=high, 512GB=medium, <512GB=low
+- Storage type: NVMe SSD=high, SATA SSD=medium, HDD=low
+- Display quality: 2K/4K/OLED=high, Full HD=medium, HD=low
+- Display size: >15.6"=high, 14-15.6"=medium, <14"=low
+- Portability: frequent travel/lightweight=high, occasional travel=medium, mostly at desk=low
+- Battery: >10hrs=high, 6-10hrs=medium, plugged in mostly=low
+
+CONVERSATION RULES:
+1. Ask 2-3 questions per message — never ask just 1, never dump all at once
+2. Vague context like "CSE student" or "some ML work" is NOT enough — you must clarify intensity
+3. Always clarify: how heavy is the ML/coding work, RAM needs, portability preference, battery needs
+4. Budget is mandatory — always ask if not provided
+5. If user states something clearly, accept it — do not re-confirm
+6. Only output the dictionary when ALL 10 values are confirmed
+7. Stop completely after outputting the dictionary
+
+ALWAYS CLARIFY UNLESS EXPLICITLY STATED:
+- How intensive is the ML work? (daily model training=high GPU, occasional experiments=medium)
+- RAM: 16GB or 32GB?
+- Screen size preference and display quality?
+- Travel frequency for portability?
+- Expected battery hours per day?
+
+FINAL OUTPUT (only when all 10 confirmed):
+"Here's your complete profile:
+
+{'GPU intensity': 'high', 'Processing speed': 'high', 'RAM capacity': 'medium', 'Storage capacity': 'medium', 'Storage type': 'high', 'Display quality': 'medium', 'Display size': 'medium', 'Portability': 'medium', 'Battery life': 'medium', 'Budget': '80000'}
+
+Finding the best laptops for you..."
+
+Start with a greeting and ask what they need the laptop for.""",
+}
+
+
 class GroqService:
     def __init__(self):
-        self.client = Groq(api_key=settings.groq_api_key)
+        # Every call — chat turns, greetings and the feature batch — goes
+        # through one scheduler so they share the API key's rate limits.
+        self.scheduler = GroqScheduler(
+            rpm=settings.groq_rpm,
+            tpm=settings.groq_tpm,
+            max_concurrency=settings.groq_max_concurrency,
+            max_retries=settings.groq_max_retries,
+            batch_reserve=settings.groq_batch_reserve,
+        )
+        # One pooled HTTP client per worker; retries are the scheduler's job
+        self.client = AsyncGroq(
+            api_key=settings.groq_api_key,
+            timeout=settings.groq_timeout,
+            max_retries=0,
+            http_client=httpx.AsyncClient(
+                timeout=settings.groq_timeout,
+                limits=httpx.Limits(
+                    max_connections=settings.groq_max_connections,
+                    max_keepalive_connections=settings.groq_max_connections,
+                ),
+                event_hooks={"response": [self._observe_response]},
+            ),
+        )
         self.model = "llama-3.1-8b-instant"
 
-    def get_completion(self, prompt: str) -> str:
-        try:
-            response = self.client.chat.completions.create(
+    async def _observe_response(self, response: httpx.Response):
+        self.scheduler.observe_headers(response.headers)
+
+    async def close(self):
+        await self.client.close()
+
+    def _estimate_tokens(self, messages: List[Dict], max_tokens: int = MAX_TOKENS) -> int:
+        # ~4 chars per token for the prompt, plus the completion allowance
+        return sum(len(m["content"]) for m in messages) // 4 + max_tokens
+
+    async def _complete(self, messages: List[Dict], temperature: float, priority: int,
+                        max_tokens: int = MAX_TOKENS) -> str:
+        async def call(ticket):
+            response = await self.client.chat.completions.create(
                 model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.1,
-                max_tokens=1000
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens
             )
+            if response.usage:
+                ticket.tokens = response.usage.total_tokens
             return response.choices[0].message.content
+
+        return await self.scheduler.run(call, priority, self._estimate_tokens(messages, max_tokens))
+
+    async def get_completion(self, prompt: str, priority: int = INTERACTIVE, max_tokens: int = MAX_TOKENS) -> str:
+        try:
+            return await self._complete([{"role": "user", "content": prompt}], 0.1, priority, max_tokens)
         except Exception as e:
             logger.error(f"Groq completion error: {e}")
             return ""
 
-    def get_chat_completion(self, messages: List[Dict]) -> str:
+    async def get_chat_completion(self, messages: List[Dict], priority: int = INTERACTIVE) -> str:
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=0.3,
-                max_tokens=1000
-            )
-            return response.choices[0].message.content
+            return await self._complete(messages, 0.3, priority)
         except Exception as e:
             logger.error(f"Groq chat completion error: {e}")
             return ""
 
+    async def stream_chat_completion(self, messages: List[Dict]) -> AsyncIterator[str]:
+        """Yield content deltas as Groq produces them."""
+        tokens = self._estimate_tokens(messages)
+        attempt = 0
+        try:
+            while True:
+                # The slot is held for the whole stream; retries happen only
+                # while opening it — once tokens reach the client the reply
+                # can't be restarted.
+                async with self.scheduler.slot(INTERACTIVE, tokens):
+                    try:
+                        stream = await self.client.chat.completions.create(
+                            model=self.model,
+                            messages=messages,
+                            temperature=0.3,
+                            max_tokens=MAX_TOKENS,
+                            stream=True
+                        )
+                    except Exception as e:
+                        attempt += 1
+                        delay = self.scheduler.retry_delay(e, attempt)
+                        if delay is None:
+                            raise
+                    else:
+                        async for chunk in stream:
+                            delta = chunk.choices[0].delta.content if chunk.choices else None
+                            if delta:
+                                yield delta
+                        return
+                await asyncio.sleep(delay)
+        except Exception as e:
+            logger.error(f"Groq streaming error: {e}")
+
     def intent_confirmation_layer(self, response_assistant: str) -> bool:
         """
         Pure Python — no LLM.
@@ -137,61 +269,7 @@ class GroqService:
         return result if len(result) == len(REQUIRED_KEYS) else None
 
     def initialize_conversation(self) -> List[Dict]:
-        system_message = """You are a friendly but thorough laptop advisor. Collect all 10 requirements before recommending.
-
-REQUIREMENTS (collect ALL before outputting dictionary):
-1. GPU intensity       → MUST be exactly: low / medium / high
-2. Processing speed    → MUST be exactly: low / medium / high
-3. RAM capacity        → MUST be exactly: low / medium / high
-4. Storage capacity    → MUST be exactly: low / medium / high
-5. Storage type        → MUST be exactly: low / medium / high
-6. Display quality     → MUST be exactly: low / medium / high
-7. Display size        → MUST be exactly: low / medium / high
-8. Portability         → MUST be exactly: low / medium / high
-9. Battery life        → MUST be exactly: low / medium / high
-10. Budget             → number only in INR (e.g. 80000)
-
-⚠️ CRITICAL: Every value in the dictionary MUST be exactly 'low', 'medium', or 'high'.
-NEVER use 'medium to high', 'moderate', 'good', or any other variation.
-If unsure between two levels, pick the higher one.
-
-MAPPING GUIDE:
-- GPU: gaming/ML/3D/video editing=high, photo editing/light gaming=medium, basic use=low
-- Processing: i7+/Ryzen7+/heavy workloads=high, i5/Ryzen5/coding/multitasking=medium, i3/basic=low
-- RAM: 32GB+=high, 16GB=medium, 8GB=low
-- Storage capacity: >1TB=high, 512GB=medium, <512GB=low
-- Storage type: NVMe SSD=high, SATA SSD=medium, HDD=low
-- Display quality: 2K/4K/OLED=high, Full HD=medium, HD=low
-- Display size: >15.6"=high, 14-15.6"=medium, <14"=low
-- Portability: frequent travel/lightweight=high, occasional travel=medium, mostly at desk=low
-- Battery: >10hrs=high, 6-10hrs=medium, plugged in mostly=low
-
-CONVERSATION RULES:
-1. Ask 2-3 questions per message — never ask just 1, never dump all at once
-2. Vague context like "CSE student" or "some ML work" is NOT enough — you must clarify intensity
-3. Always clarify: how heavy is the ML/coding work, RAM needs, portability preference, battery needs
-4. Budget is mandatory — always ask if not provided
-5. If user states something clearly, accept it — do not re-confirm
-6. Only output the dictionary when ALL 10 values are confirmed
-7. Stop completely after outputting the dictionary
-
-ALWAYS CLARIFY UNLESS EXPLICITLY STATED:
-- How intensive is the ML work? (daily model training=high GPU, occasional experiments=medium)
-- RAM: 16GB or 32GB?
-- Screen size preference and display quality?
-- Travel frequency for portability?
-- Expected battery hours per day?
-
-FINAL OUTPUT (only when all 10 confirmed):
-"Here's your complete profile:
-
-{'GPU intensity': 'high', 'Processing speed': 'high', 'RAM capacity': 'medium', 'Storage capacity': 'medium', 'Storage type': 'high', 'Display quality': 'medium', 'Display size': 'medium', 'Portability': 'medium', 'Battery life': 'medium', 'Budget': '80000'}
-
-Finding the best laptops for you..."
-
-Start with a greeting and ask what they need the laptop for."""
-
-        return [{"role": "system", "content": system_message}]
+        return [{"role": "system", "content": SYSTEM_PROMPTS[SYSTEM_PROMPT_ID]}]
 
 
 groq_service = GroqService()
\ No newline at end of file
@@ -1,4 +1,7 @@
 from app.database import get_database
+from app.services.catalog_engine import CatalogEngine, parse_budget, parse_price
+from app.services.catalog_snapshot import catalog_snapshot, SNAPSHOT_PROJECTION
+from app.services.recommendation_cache import recommendation_cache, profile_key
 from typing import List, Dict, Optional
 import re
 import ast
@@ -6,9 +9,24 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+MIN_SCORE = 5  # below this a laptop is only returned when nothing else qualifies
+
+
+def _describe_plan(stage: Dict) -> str:
+    name = stage.get('stage', '?')
+    if stage.get('indexName'):
+        name += f"({stage['indexName']})"
+    children = stage.get('inputStages') or ([stage['inputStage']] if 'inputStage' in stage else [])
+    if not children:
+        return name
+    return f"{name} > " + ", ".join(_describe_plan(c) for c in children)
+
 
 class LaptopService:
 
+    def __init__(self):
+        self._plans: Dict[tuple, str] = {}  # query shape → winning plan, explained once
+
     def _get_db(self):
         """Get DB instance fresh every time — no stale None reference."""
         db = get_database()
@@ -22,6 +40,38 @@ class LaptopService:
             laptop['_id'] = str(laptop['_id'])
         return laptops
 
+    async def get_laptops_within_budget(self, budget: int) -> List[Dict]:
+        """
+        Budget filter pushed down to MongoDB (uses the price_inr_1 index).
+        Documents ingested before price_inr existed only have `price`; they
+        are fetched too and priced with the same parse_price as CatalogEngine.
+        """
+        query = {'$or': [{'price_inr': {'$lte': budget}}, {'price_inr': {'$exists': False}}]}
+        cursor = self._get_db().laptops.find(query, SNAPSHOT_PROJECTION)
+        logger.info(f"Laptops query {query} plan: {await self._query_plan(query)}")
+        laptops = []
+        for laptop in await cursor.to_list(length=None):
+            if 'price_inr' not in laptop:
+                price = parse_price(laptop.get('price'))
+                if price is None or price > budget:
+                    continue
+            laptop['_id'] = str(laptop['_id'])
+            laptops.append(laptop)
+        return laptops
+
+    async def _query_plan(self, query: Dict) -> str:
+        """Winning plan for a query shape, e.g. 'FETCH > IXSCAN(price_inr_1)'."""
+        shape = tuple(sorted(query))
+        if shape not in self._plans:
+            try:
+                explain = await self._get_db().laptops.find(query, SNAPSHOT_PROJECTION).explain()
+                plan = explain['queryPlanner']['winningPlan']
+                self._plans[shape] = _describe_plan(plan.get('queryPlan', plan))
+            except Exception as e:
+                logger.debug(f"Explain failed: {e}")
+                return "unknown"
+        return self._plans[shape]
+
     def extract_dictionary_from_string(self, string: str) -> Optional[Dict]:
         """Kept for backward compatibility."""
         match = re.search(r'\{[^{}]+\}', string, re.DOTALL)
@@ -40,65 +90,47 @@ class LaptopService:
 
         logger.info(f"User Requirements: {user_req}")
 
-        # Parse budget — strip everything except digits
-        budget_str = str(user_req.get('budget', '0'))
-        digits = re.sub(r'[^\d]', '', budget_str)
-        budget = int(digits) if digits else 0
+        budget = parse_budget(user_req)
         logger.info(f"Budget: ₹{budget}")
 
-        all_laptops = await self.get_all_laptops()
-        logger.info(f"Total laptops in database: {len(all_laptops)}")
-
-        # Filter by budget
-        filtered_laptops = []
-        for laptop in all_laptops:
-            try:
-                laptop_price = int(str(laptop['price']).replace(',', ''))
-                if laptop_price <= budget:
-                    filtered_laptops.append(laptop)
-            except Exception:
-                continue
-
-        logger.info(f"Laptops within budget: {len(filtered_laptops)}")
-
-        if not filtered_laptops:
+        engine = catalog_snapshot.get_engine()
+        if engine is None:
+            logger.warning("Catalog snapshot not loaded — querying MongoDB")
+            engine = CatalogEngine.from_laptops(await self.get_laptops_within_budget(budget))
+            return self._rank(engine, user_req, budget)
+
+        version = catalog_snapshot.version
+        key = profile_key(user_req, engine.price_breakpoint(budget))
+        cached = recommendation_cache.get(key, version)
+        if cached is not None:
+            logger.info(f"Recommendation cache hit — returning {len(cached)} laptops")
+            return cached
+
+        results = self._rank(engine, user_req, budget)
+        recommendation_cache.put(key, version, results)
+        return results
+
+    async def get_recommended(self, user_req: Dict, laptop_ids: List[str]) -> List[Dict]:
+        """
+        Expand a session's recommendation IDs into the laptops as they were
+        returned (with score and match_details). Re-ranked from the profile,
+        so usually a recommendation cache hit; laptops that have since left
+        the catalog or the results are skipped.
+        """
+        ranked = {laptop['_id']: laptop for laptop in await self.compare_laptops_with_user(user_req)}
+        return [ranked[laptop_id] for laptop_id in laptop_ids if laptop_id in ranked]
+
+    def _rank(self, engine: CatalogEngine, user_req: Dict, budget: int) -> List[Dict]:
+        logger.info(f"Laptops considered: {len(engine)}")
+
+        top_laptops, within_budget = engine.rank(user_req, budget)
+        logger.info(f"Laptops within budget: {within_budget}")
+
+        if not top_laptops:
             logger.warning("No laptops found within budget")
             return []
 
-        mappings = {'low': 0, 'medium': 1, 'high': 2}
-        scoreable_features = [
-            'gpu intensity', 'processing speed', 'ram capacity',
-            'storage capacity', 'storage type', 'display quality',
-            'display size', 'portability', 'battery life'
-        ]
-
-        for laptop in filtered_laptops:
-            score = 0
-            laptop_feature = laptop.get('laptop_feature', {})
-            match_details = {}
-
-            if not laptop_feature:
-                laptop['score'] = 0
-                laptop['match_details'] = {}
-                continue
-
-            for feature in scoreable_features:
-                user_val = str(user_req.get(feature, 'low')).lower()
-                laptop_val = str(laptop_feature.get(feature, 'low')).lower()
-
-                if mappings.get(laptop_val, 0) >= mappings.get(user_val, 0):
-                    score += 1
-                    match_details[feature] = f"✅ {laptop_val} (need: {user_val})"
-                else:
-                    match_details[feature] = f"❌ {laptop_val} (need: {user_val})"
-
-            laptop['score'] = score
-            laptop['match_details'] = match_details
-
-        filtered_laptops.sort(key=lambda x: x.get('score', 0), reverse=True)
-        top_laptops = filtered_laptops[:3]
-
-        validated = [l for l in top_laptops if l.get('score', 0) >= 5]
+        validated = [l for l in top_laptops if l.get('score', 0) >= MIN_SCORE]
 
         if not validated and top_laptops:
             logger.warning("No laptops scored ≥5, returning top 3 anyway")
@@ -107,6 +139,5 @@ class LaptopService:
         logger.info(f"Returning {len(validated)} laptops")
         return validated
 
-
 logger.debug("laptop_service module loaded")
 laptop_service = LaptopService()
\ No newline at end of file
@@ -0,0 +1,202 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional, Set, Tuple
+from app.config import get_settings
+from app.services.cache_service import cache_key, price_cache
+from app.services.scraper_service import fetch_prices
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class PriceFetcher:
+    """
+    Price lookups behind /api/scraper/prices.
+
+    - Single flight: concurrent misses for the same laptop share one scrape.
+    - Stale-while-revalidate: expired (but not too old) cache entries are
+      returned at once while one background scrape refreshes them.
+    - At most `max_concurrent` scrapes run at a time across all laptops;
+      the rest wait their turn instead of launching more browsers.
+    - Pre-fetches may hold at most `max_concurrent - 1` of those, so one
+      is always left for a user waiting on a click.
+    """
+
+    def __init__(self, max_concurrent: int):
+        self.max_concurrent = max_concurrent
+        self.prefetch_limit = max_concurrent - 1
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._prefetch_semaphore = asyncio.Semaphore(max(self.prefetch_limit, 0))
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._active = 0
+        self.stats = {"fresh_hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0,
+                      "scrapes": 0, "refreshes": 0, "prefetches": 0, "failures": 0}
+
+    async def get_prices(self, laptop_name: str) -> Tuple[dict, bool, bool]:
+        """Return (prices, from_cache, stale)."""
+        key = cache_key(laptop_name)
+        cached = await price_cache.get(key)
+        if cached:
+            prices, stale = cached
+            if stale:
+                self.stats["stale_hits"] += 1
+                self._start(key, laptop_name, refresh=True)
+            else:
+                self.stats["fresh_hits"] += 1
+            return prices, True, stale
+
+        self.stats["misses"] += 1
+        # shield: a client hanging up must not cancel the scrape others wait on
+        prices = await asyncio.shield(self._start(key, laptop_name))
+        return prices, False, False
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._inflight
+
+    async def prefetch(self, key: str, laptop_name: str) -> bool:
+        """
+        Scrape into the cache unless it's already fresh or being scraped;
+        False if skipped. Waits for a pre-fetch slot before starting, so the
+        scrape a user may join is never the one queued behind the limit.
+        """
+        async with self._prefetch_semaphore:
+            # Checked once the slot is ours — a user may have fetched it meanwhile
+            cached = await price_cache.get(key)
+            if (cached and not cached[1]) or self.in_flight(key):
+                return False
+            self.stats["prefetches"] += 1
+            await asyncio.shield(self._start(key, laptop_name))
+            return True
+
+    def _start(self, key: str, laptop_name: str, refresh: bool = False) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+            return task
+
+        if refresh:
+            self.stats["refreshes"] += 1
+        task = asyncio.create_task(self._scrape(key, laptop_name))
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._done(key, t))
+        return task
+
+    def _done(self, key: str, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            self.stats["failures"] += 1
+            logger.error(f"Price scrape failed for {key}: {task.exception()}")
+
+    async def _scrape(self, key: str, laptop_name: str) -> dict:
+        async with self._semaphore:
+            self._active += 1
+            self.stats["scrapes"] += 1
+            try:
+                prices = await fetch_prices(laptop_name)
+            finally:
+                self._active -= 1
+        await price_cache.set(key, prices)
+        return prices
+
+    async def stop(self) -> None:
+        tasks = list(self._inflight.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            "in_flight": len(self._inflight),
+            "active_scrapes": self._active,
+            "max_concurrent": self.max_concurrent,
+            "prefetch_limit": self.prefetch_limit,
+        }
+
+
+class PriceWarmer:
+    """
+    Background price pre-fetching for freshly recommended laptops, so the
+    price panel is usually served from cache by the time it's opened.
+
+    Low priority: a bounded queue (new work is dropped when full), a few
+    workers, and scrapes limited to PriceFetcher's pre-fetch slots.
+    Laptops already queued, being scraped, or freshly cached are skipped.
+    """
+
+    def __init__(self, fetcher: PriceFetcher, max_queued: int, workers: int):
+        self.fetcher = fetcher
+        self.max_queued = max_queued
+        self.workers = workers
+        self._queue: Optional[asyncio.Queue] = None
+        self._queued: Set[str] = set()
+        self._tasks: List[asyncio.Task] = []
+        self.stats = {"queued": 0, "dropped": 0, "duplicates": 0, "already_cached": 0, "warmed": 0, "failures": 0}
+
+    async def start(self) -> None:
+        if not settings.scraping_enabled or self._tasks:
+            return
+        if self.fetcher.prefetch_limit < 1:
+            logger.info("Price warming off — SCRAPER_MAX_CONCURRENT=1 leaves no slot to spare")
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        self._queued.clear()
+
+    def enqueue(self, laptop_names: List[str]) -> None:
+        """Queue names without waiting; never blocks the chat response."""
+        if self._queue is None:
+            return
+        for laptop_name in laptop_names:
+            key = cache_key(laptop_name)
+            if key in self._queued or self.fetcher.in_flight(key):
+                self.stats["duplicates"] += 1
+                continue
+            try:
+                self._queue.put_nowait((key, laptop_name.strip()))
+            except asyncio.QueueFull:
+                self.stats["dropped"] += 1
+                continue
+            self._queued.add(key)
+            self.stats["queued"] += 1
+
+    async def _worker(self) -> None:
+        while True:
+            key, laptop_name = await self._queue.get()
+            try:
+                await self._warm(key, laptop_name)
+            except Exception as e:
+                self.stats["failures"] += 1
+                logger.warning(f"Price pre-warm failed for {key}: {e}")
+            finally:
+                self._queued.discard(key)
+                self._queue.task_done()
+
+    async def _warm(self, key: str, laptop_name: str) -> None:
+        if await self.fetcher.prefetch(key, laptop_name):
+            self.stats["warmed"] += 1
+        else:
+            self.stats["already_cached"] += 1
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+            "max_queued": self.max_queued,
+            "workers": self.workers,
+        }
+
+
+price_fetcher = PriceFetcher(max_concurrent=settings.scraper_max_concurrent)
+price_warmer = PriceWarmer(
+    price_fetcher,
+    max_queued=settings.price_warm_queue_size,
+    workers=settings.price_warm_workers,
+)
@@ -0,0 +1,82 @@
+import time
+import logging
+from collections import OrderedDict
+from typing import List, Dict, Optional, Tuple
+from app.config import get_settings
+from app.services.catalog_engine import SCOREABLE_FEATURES
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def profile_key(user_req: Dict, price_breakpoint: int) -> Tuple:
+    """
+    Key a profile on its nine levels plus the budget's price breakpoint.
+    Every budget between two catalog prices selects the same laptops, so
+    they share one entry.
+    """
+    levels = tuple(str(user_req.get(f, 'low')).lower() for f in SCOREABLE_FEATURES)
+    return levels + (price_breakpoint,)
+
+
+def _copy_results(results: List[Dict]) -> List[Dict]:
+    # Routes keep results in the session; never hand out the cached dicts
+    return [dict(r, match_details=dict(r.get('match_details', {}))) for r in results]
+
+
+class RecommendationCache:
+    """LRU + TTL cache of ranked results, cleared whenever the catalog version changes."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple, Tuple[float, List[Dict]]]" = OrderedDict()
+        self._version: Optional[int] = None
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    def _check_version(self, version: int) -> None:
+        if version != self._version:
+            if self._entries:
+                logger.info(f"Catalog version {self._version} → {version}, dropping {len(self._entries)} cached rankings")
+                self.stats["invalidations"] += 1
+            self._entries.clear()
+            self._version = version
+
+    def get(self, key: Tuple, version: int) -> Optional[List[Dict]]:
+        self._check_version(version)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        expires_at, results = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.stats["expirations"] += 1
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return _copy_results(results)
+
+    def put(self, key: Tuple, version: int, results: List[Dict]) -> None:
+        self._check_version(version)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, _copy_results(results))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def get_stats(self) -> Dict:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "size": len(self._entries),
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+            "catalog_version": self._version,
+        }
+
+
+recommendation_cache = RecommendationCache(
+    max_entries=settings.recommendation_cache_size,
+    ttl_seconds=settings.recommendation_cache_ttl,
+)
@@ -1,13 +1,56 @@
+import asyncio
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional
 from app.config import settings
+from app.services.scrapers.base import ScraperBackend
 
 logger = logging.getLogger(__name__)
 
+SITES = ["flipkart", "croma"]
 
-def scrape_all_prices(laptop_name: str) -> dict:
+_backend: Optional[ScraperBackend] = None
+
+
+def get_backend() -> ScraperBackend:
+    """
+    Scraper backend chosen by settings.scraper_backend ('selenium' or 'http').
+    Imported lazily so servers without Chrome never import Selenium.
+    """
+    global _backend
+    if _backend is None:
+        if settings.scraper_backend == "http":
+            from app.services.scrapers.http_backend import HttpBackend
+            _backend = HttpBackend()
+        else:
+            from app.services.scrapers.selenium_backend import SeleniumBackend
+            _backend = SeleniumBackend()
+    return _backend
+
+
+async def start_scrapers() -> None:
+    if not settings.scraping_enabled:
+        return
+    try:
+        await get_backend().start()
+    except Exception as e:
+        logger.warning(f"Could not start {settings.scraper_backend} scraper backend: {e}")
+
+
+async def stop_scrapers() -> None:
+    if _backend is not None:
+        await _backend.close()
+
+
+def get_scraper_stats() -> dict:
+    if not settings.scraping_enabled:
+        return {"enabled": False}
+    stats = _backend.get_stats() if _backend is not None else {}
+    return {"enabled": True, "backend": settings.scraper_backend, **stats}
+
+
+async def fetch_prices(laptop_name: str) -> dict:
     """
-    Runs Flipkart + Croma scrapers in parallel.
+    Scrapes Flipkart + Croma concurrently with the configured backend.
     Returns empty results if SCRAPING_ENABLED=false (cloud deployment).
     """
     results = {
@@ -22,27 +65,15 @@ def scrape_all_prices(laptop_name: str) -> dict:
         results["note"] = "Live price scraping is disabled in cloud deployment. Run locally to see live prices."
         return results
 
-    # Only import scrapers when scraping is enabled
-    # (avoids Selenium import errors on servers without Chrome)
-    from app.services.scrapers.flipkart import scrape_flipkart
-    from app.services.scrapers.croma import scrape_croma
-
-    scrapers = {
-        "flipkart": scrape_flipkart,
-        "croma":    scrape_croma,
-    }
+    backend = get_backend()
+    site_results = await asyncio.gather(
+        *(backend.scrape(site, laptop_name) for site in SITES),
+        return_exceptions=True,
+    )
+    for site, found in zip(SITES, site_results):
+        if isinstance(found, Exception):
+            logger.error(f"{site} scraper failed: {found}")
+            found = []
+        results[site] = found
 
-    with ThreadPoolExecutor(max_workers=2) as executor:
-        future_to_site = {
-            executor.submit(fn, laptop_name): site
-            for site, fn in scrapers.items()
-        }
-        for future in as_completed(future_to_site):
-            site = future_to_site[future]
-            try:
-                results[site] = future.result()
-            except Exception as e:
-                logger.error(f"{site} scraper failed: {e}")
-                results[site] = []
-
-    return results
\ No newline at end of file
+    return results
@@ -1,2 +1,2 @@
-from .flipkart import scrape_flipkart
-from .croma import scrape_croma
+# Backends are imported on demand by scraper_service — the Selenium one
+# needs selenium/webdriver-manager, the HTTP one only httpx + selectolax.
@@ -0,0 +1,24 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List
+
+
+class ScraperBackend(ABC):
+    """
+    How search results are fetched for a site. Every backend returns up to
+    three {"name", "price", "link"} dicts per site, [] when nothing is found.
+    """
+
+    name = "base"
+
+    async def start(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    @abstractmethod
+    async def scrape(self, site: str, laptop_name: str) -> List[Dict]:
+        ...
+
+    def get_stats(self) -> Dict:
+        return {}
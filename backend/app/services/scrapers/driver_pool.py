@@ -0,0 +1,264 @@
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, List, Optional
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from webdriver_manager.chrome import ChromeDriverManager
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def resolve_driver_path() -> str:
+    """Locate (or download) chromedriver once per process."""
+    path = ChromeDriverManager().install()
+    logger.info(f"Using chromedriver at {path}")
+    return path
+
+
+def create_driver():
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument(
+        "--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Safari/537.36"
+    )
+    service = Service(resolve_driver_path())
+    return webdriver.Chrome(service=service, options=options)
+
+
+class PooledDriver:
+    __slots__ = ("driver", "uses")
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+
+
+class DriverPool:
+    """
+    Long-lived headless Chrome instances for one site.
+
+    At most `size` drivers exist; callers beyond that wait up to `timeout`
+    seconds. Drivers are health-checked when handed out, reset (cookies,
+    blank page) when returned, and replaced after `max_uses` scrapes or
+    as soon as they stop responding.
+    """
+
+    def __init__(self, site: str, size: int, max_uses: int, timeout: float):
+        self.site = site
+        self.size = size
+        self.max_uses = max_uses
+        self.timeout = timeout
+        self._idle: List[PooledDriver] = []
+        self._total = 0
+        self._in_use = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self.stats = {"acquired": 0, "created": 0, "waits": 0, "timeouts": 0, "recycled": 0, "crashed": 0}
+
+    @contextmanager
+    def driver(self):
+        """Borrow a driver: `with pool.driver() as driver: ...`"""
+        pooled = self._acquire()
+        try:
+            yield pooled.driver
+        finally:
+            self._release(pooled)
+
+    def _acquire(self) -> PooledDriver:
+        deadline = time.monotonic() + self.timeout
+        pooled: Optional[PooledDriver] = None
+        with self._cond:
+            self.stats["acquired"] += 1
+            waited = False
+            while True:
+                if self._closed:
+                    raise RuntimeError(f"{self.site} browser pool is closed")
+                if self._idle:
+                    pooled = self._idle.pop()
+                    break
+                if self._total < self.size:
+                    self._total += 1  # reserve the slot; launch outside the lock
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.stats["timeouts"] += 1
+                    raise TimeoutError(f"No {self.site} browser free within {self.timeout}s")
+                if not waited:
+                    self.stats["waits"] += 1
+                    waited = True
+                self._cond.wait(remaining)
+            self._in_use += 1
+
+        if pooled is not None and self._healthy(pooled):
+            return pooled
+        if pooled is not None:
+            with self._cond:
+                self.stats["crashed"] += 1
+            self._quit(pooled)
+        try:
+            pooled = PooledDriver(create_driver())
+        except Exception:
+            self._drop_slot(in_use=True)
+            raise
+        with self._cond:
+            if not self._closed:
+                self.stats["created"] += 1
+                return pooled
+        # Closed while the browser launched — don't hand it out
+        self._quit(pooled)
+        self._drop_slot(in_use=True)
+        raise RuntimeError(f"{self.site} browser pool is closed")
+
+    def _drop_slot(self, in_use: bool) -> None:
+        with self._cond:
+            self._total -= 1
+            if in_use:
+                self._in_use -= 1
+            self._cond.notify()
+
+    def _release(self, pooled: PooledDriver) -> None:
+        pooled.uses += 1
+        worn_out = pooled.uses >= self.max_uses
+        reset_failed = False
+        if not worn_out and not self._closed:
+            try:
+                self._reset(pooled.driver)
+            except Exception as e:
+                logger.warning(f"{self.site} browser failed to reset, replacing it: {e}")
+                reset_failed = True
+
+        with self._cond:
+            keep = not (worn_out or reset_failed or self._closed)
+            if reset_failed:
+                self.stats["crashed"] += 1
+            elif worn_out and not self._closed:
+                self.stats["recycled"] += 1
+            self._in_use -= 1
+            if keep:
+                self._idle.append(pooled)
+            else:
+                self._total -= 1
+            self._cond.notify()
+        if not keep:
+            self._quit(pooled)
+
+    @staticmethod
+    def _healthy(pooled: PooledDriver) -> bool:
+        try:
+            pooled.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _reset(driver) -> None:
+        """Leave no state from the previous search behind."""
+        for handle in driver.window_handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(driver.window_handles[0])
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        driver.get("about:blank")
+
+    @staticmethod
+    def _quit(pooled: PooledDriver) -> None:
+        try:
+            pooled.driver.quit()
+        except Exception:
+            pass
+
+    def warm(self, count: int = 1) -> None:
+        """Launch drivers ahead of the first request."""
+        for _ in range(count):
+            with self._cond:
+                if self._closed or self._total >= self.size:
+                    return
+                self._total += 1
+            try:
+                pooled = PooledDriver(create_driver())
+            except Exception:
+                self._drop_slot(in_use=False)
+                raise
+            with self._cond:
+                if not self._closed:
+                    self.stats["created"] += 1
+                    self._idle.append(pooled)
+                    self._cond.notify()
+                    continue
+            # Closed while the browser launched
+            self._quit(pooled)
+            self._drop_slot(in_use=False)
+            return
+
+    def close(self) -> None:
+        """Quit idle drivers; borrowed ones are quit when returned, and no new ones are handed out."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._total -= len(idle)
+            self._cond.notify_all()  # waiters raise instead of timing out
+        for pooled in idle:
+            self._quit(pooled)
+
+    def get_stats(self) -> Dict:
+        with self._cond:
+            return {
+                **self.stats,
+                "size": self.size,
+                "alive": self._total,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "utilization": round(self._in_use / self.size, 2) if self.size else 0.0,
+            }
+
+
+_pools: Dict[str, DriverPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(site: str) -> DriverPool:
+    with _pools_lock:
+        if site not in _pools:
+            _pools[site] = DriverPool(
+                site,
+                size=settings.scraper_pool_size,
+                max_uses=settings.scraper_driver_max_uses,
+                timeout=settings.scraper_pool_timeout,
+            )
+        return _pools[site]
+
+
+def warm_pools(sites: List[str]) -> None:
+    """Resolve chromedriver and start one browser per site (run off the event loop)."""
+    try:
+        resolve_driver_path()
+        for site in sites:
+            get_pool(site).warm(1)
+        logger.info(f"Scraper browsers ready for {', '.join(sites)}")
+    except Exception as e:
+        logger.warning(f"Could not pre-start scraper browsers: {e}")
+
+
+def close_pools() -> None:
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close()
+
+
+def get_pool_stats() -> Dict:
+    with _pools_lock:
+        pools = dict(_pools)
+    return {site: pool.get_stats() for site, pool in pools.items()}
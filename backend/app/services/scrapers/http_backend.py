@@ -0,0 +1,107 @@
+import time
+import logging
+from typing import Dict, List, Optional
+import httpx
+from selectolax.lexbor import LexborHTMLParser
+from app.config import settings
+from .base import ScraperBackend
+from .sites import SELECTORS, MAX_RESULTS, absolute_link, search_url, fallback_link, format_price
+
+logger = logging.getLogger(__name__)
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml",
+    "Accept-Language": "en-IN,en;q=0.9",
+}
+
+
+def parse_results(site: str, html: str, laptop_name: str) -> List[Dict]:
+    """Extract up to three results from a search page with the site's CSS selectors."""
+    selectors = SELECTORS[site]
+    results = []
+    for card in LexborHTMLParser(html).css(selectors["card"]):
+        if len(results) >= MAX_RESULTS:
+            break
+        name_el = card.css_first(selectors["name"])
+        name = name_el.text(separator=" ", strip=True) if name_el else ""
+        if not name:
+            continue
+
+        price_el = card.css_first(selectors["price"])
+        price = format_price(site, price_el.text(strip=True) if price_el else "")
+
+        link_el = card.css_first(selectors["link"])
+        href = link_el.attributes.get("href") if link_el else None
+        link = absolute_link(site, href) if href else fallback_link(site, laptop_name)
+
+        results.append({"name": name[:80], "price": price, "link": link})
+    return results
+
+
+class HttpBackend(ScraperBackend):
+    """
+    Plain HTTP fetch of the search pages over one pooled client, parsed
+    with selectolax (lexbor) — no browser, so it runs where Chrome isn't available.
+
+    Flipkart only: Croma renders its search results client-side, so its
+    HTML has no product cards and Croma prices need the Selenium backend.
+    """
+
+    name = "http"
+    # Sites whose search results are in the server-rendered HTML
+    sites = ("flipkart",)
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self.stats = {"requests": 0, "failures": 0, "empty": 0, "unsupported": 0, "fetch_seconds": 0.0}
+
+    async def start(self) -> None:
+        skipped = [site for site in SELECTORS if site not in self.sites]
+        if skipped:
+            logger.warning(f"HTTP scraper backend returns no prices for {', '.join(skipped)} "
+                           f"(client-rendered) — use SCRAPER_BACKEND=selenium for those")
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers=HEADERS,
+                timeout=settings.scraper_http_timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=settings.scraper_http_max_connections),
+            )
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def scrape(self, site: str, laptop_name: str) -> List[Dict]:
+        if site not in self.sites:
+            self.stats["unsupported"] += 1
+            return []
+        self.stats["requests"] += 1
+        started = time.monotonic()
+        try:
+            response = await self._get_client().get(search_url(site, laptop_name))
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            self.stats["failures"] += 1
+            logger.error(f"{site} fetch failed for {laptop_name}: {e}")
+            return []
+        finally:
+            self.stats["fetch_seconds"] += time.monotonic() - started
+
+        results = parse_results(site, response.text, laptop_name)
+        if not results:
+            self.stats["empty"] += 1
+            logger.warning(f"{site}: no results parsed for {laptop_name}")
+        return results
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, "fetch_seconds": round(self.stats["fetch_seconds"], 2)}
@@ -0,0 +1,43 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+from app.config import settings
+from .base import ScraperBackend
+from .driver_pool import warm_pools, close_pools, get_pool_stats
+from .flipkart import scrape_flipkart
+from .croma import scrape_croma
+
+SCRAPERS = {
+    "flipkart": scrape_flipkart,
+    "croma": scrape_croma,
+}
+
+
+class SeleniumBackend(ScraperBackend):
+    """Headless Chrome from the per-site driver pools (needs Chrome installed)."""
+
+    name = "selenium"
+
+    def __init__(self):
+        # Own threads, one per pooled browser — more would only block on the
+        # pool, and scrapes must not starve the shared default executor
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.scraper_pool_size * len(SCRAPERS),
+            thread_name_prefix="scraper",
+        )
+
+    async def start(self) -> None:
+        # Browsers launch in the background; the API is usable meanwhile
+        asyncio.get_running_loop().run_in_executor(self._executor, warm_pools, list(SCRAPERS))
+
+    async def close(self) -> None:
+        # Default executor: queued behind scrapes on ours, this could wait
+        # for every pending search to finish first
+        await asyncio.get_running_loop().run_in_executor(None, close_pools)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def scrape(self, site: str, laptop_name: str) -> List[Dict]:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, SCRAPERS[site], laptop_name)
+
+    def get_stats(self) -> Dict:
+        return {"pools": get_pool_stats()}
@@ -0,0 +1,58 @@
+from typing import Dict
+from app.config import settings
+
+# CSS selectors shared by the Selenium and HTTP scraper backends
+SELECTORS: Dict[str, Dict[str, str]] = {
+    "flipkart": {
+        "card": "div.jIjQ8S",
+        "name": "div.RG5Slk",
+        "price": "div.hZ3P6w",
+        "link": "a.k7wcnx",
+    },
+    "croma": {
+        "card": "li[class*='product-item']",
+        "name": "h3[class*='product-title']",
+        "price": "span[data-testid='new-price']",
+        # First anchor pointing at a product page (/p/ in the URL)
+        "link": "a[href*='/p/']",
+    },
+}
+
+MAX_RESULTS = 3
+
+
+def base_url(site: str) -> str:
+    """Configurable so scrapers can be pointed at a mirror or a local stub."""
+    return {"flipkart": settings.flipkart_base_url, "croma": settings.croma_base_url}[site].rstrip("/")
+
+
+def search_url(site: str, laptop_name: str) -> str:
+    if site == "flipkart":
+        query = laptop_name.replace(" ", "+")
+        return f"{base_url(site)}/search?q={query}&otracker=search&as-show=on&as=off"
+    query = laptop_name.replace(" ", "%20")
+    return f"{base_url(site)}/searchB?q={query}%3Arelevance&fromUrl=home"
+
+
+def fallback_link(site: str, laptop_name: str) -> str:
+    """Search page link used when a card has no product link."""
+    if site == "flipkart":
+        return f"{base_url(site)}/search?q={laptop_name.replace(' ', '+')}"
+    return f"{base_url(site)}/searchB?q={laptop_name.replace(' ', '%20')}"
+
+
+def absolute_link(site: str, href: str) -> str:
+    """Product link from a card's href; relative ones resolve under base_url, path included."""
+    if href.startswith(("http://", "https://")):
+        return href
+    if href.startswith("//"):
+        return "https:" + href
+    return f"{base_url(site)}/{href.lstrip('/')}"
+
+
+def format_price(site: str, price: str) -> str:
+    if not price:
+        return "N/A"
+    if site == "croma" and not price.startswith("₹"):
+        return "₹" + price
+    return price
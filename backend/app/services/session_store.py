@@ -0,0 +1,405 @@
+import json
+import time
+import uuid
+import asyncio
+import logging
+from datetime import datetime
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from pymongo import ASCENDING, DeleteOne, IndexModel, UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure, PyMongoError
+from app.config import get_settings
+from app.database import get_database
+from app.services.conversation import Turn
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+SESSIONS_COLLECTION = "chat_sessions"
+# Recent op ids kept on each document so a retried update isn't applied twice
+OPS_KEPT = 20
+
+
+def estimate_session_bytes(session: Dict) -> int:
+    """Approximate memory held by a session (its JSON size)."""
+    return len(json.dumps(session, default=_json_default))
+
+
+def _json_default(value):
+    return value.to_record() if isinstance(value, Turn) else str(value)
+
+
+def _fingerprint(value) -> str:
+    """Comparable form of a session field, to $set only what changed."""
+    return json.dumps(value, default=_json_default, sort_keys=True)
+
+
+class SessionStore:
+    """
+    In-process chat sessions, bounded by idle TTL, entry count and an
+    approximate byte budget (least recently used sessions go first).
+
+    Sessions are plain dicts mutated in place by the chat routes; `put`
+    after a turn refreshes the session's recency and size estimate.
+    Expired sessions are dropped lazily on access and by a periodic sweep.
+    """
+
+    def __init__(self, idle_ttl: float, max_entries: int, max_bytes: int, sweep_interval: float):
+        self.idle_ttl = idle_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self._sessions: "OrderedDict[str, Dict]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._last_access: Dict[str, float] = {}
+        self._bytes = 0
+        self._sweep_task: Optional[asyncio.Task] = None
+        self.stats = {"hits": 0, "misses": 0, "created": 0, "evictions": 0, "expirations": 0, "sweeps": 0}
+
+    async def start(self) -> None:
+        if self._sweep_task is None or self._sweep_task.done():
+            self._sweep_task = asyncio.create_task(self._sweep_loop())
+
+    async def stop(self) -> None:
+        if self._sweep_task and not self._sweep_task.done():
+            self._sweep_task.cancel()
+            try:
+                await self._sweep_task
+            except asyncio.CancelledError:
+                pass
+        self._sweep_task = None
+
+    async def get(self, session_id: str) -> Optional[Dict]:
+        session = self._sessions.get(session_id)
+        if session is not None and self._expired(session_id, time.monotonic()):
+            self._remove(session_id)
+            self.stats["expirations"] += 1
+            session = None
+        if session is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        self._touch(session_id)
+        return session
+
+    async def put(self, session_id: str, session: Dict) -> None:
+        if session_id not in self._sessions:
+            self.stats["created"] += 1
+        size = estimate_session_bytes(session)
+        self._bytes += size - self._sizes.get(session_id, 0)
+        self._sessions[session_id] = session
+        self._sizes[session_id] = size
+        self._touch(session_id)
+        self._evict(keep=session_id)
+
+    async def delete(self, session_id: str) -> None:
+        self._remove(session_id)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def _touch(self, session_id: str) -> None:
+        self._sessions.move_to_end(session_id)
+        self._last_access[session_id] = time.monotonic()
+
+    def _expired(self, session_id: str, now: float) -> bool:
+        return now - self._last_access.get(session_id, now) > self.idle_ttl
+
+    def _remove(self, session_id: str) -> None:
+        if self._sessions.pop(session_id, None) is not None:
+            self._bytes -= self._sizes.pop(session_id, 0)
+            self._last_access.pop(session_id, None)
+
+    def _evict(self, keep: str) -> None:
+        while len(self._sessions) > 1 and (len(self._sessions) > self.max_entries or self._bytes > self.max_bytes):
+            oldest = next(iter(self._sessions))
+            if oldest == keep:
+                break
+            self._remove(oldest)
+            self.stats["evictions"] += 1
+
+    def sweep(self) -> int:
+        """Drop every idle session; returns how many were removed."""
+        now = time.monotonic()
+        # OrderedDict is in access order, so stop at the first live session
+        expired = []
+        for session_id in self._sessions:
+            if not self._expired(session_id, now):
+                break
+            expired.append(session_id)
+        for session_id in expired:
+            self._remove(session_id)
+        self.stats["expirations"] += len(expired)
+        self.stats["sweeps"] += 1
+        return len(expired)
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            removed = self.sweep()
+            if removed:
+                logger.info(f"Session sweep removed {removed} idle sessions ({len(self._sessions)} live)")
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            "backend": "memory",
+            "live": len(self._sessions),
+            "estimated_bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+        }
+
+
+class MongoSessionStore:
+    """
+    Chat sessions shared by every worker through a MongoDB collection.
+
+    Documents expire via a TTL index on updated_at. Writes are queued and
+    flushed by a background task in ordered bulk_writes, so a chat turn
+    never waits on MongoDB. New sessions are the exception: they're written
+    before `put` returns so any worker can find them straight away.
+
+    Turns are appended with $push and only fields that changed are $set,
+    so two workers writing the same session both keep their turns instead
+    of one version overwriting the other. Each update carries an op id and
+    is skipped if the document already has it, which makes retries safe.
+    Every update also bumps `version`; a cached session is trusted for
+    `revalidate_after` seconds, then kept only if the stored version is
+    still the one this worker wrote or read.
+    """
+
+    def __init__(self, idle_ttl: float, cache: SessionStore, revalidate_after: float,
+                 flush_interval: float, batch_size: int):
+        self.idle_ttl = idle_ttl
+        self.cache = cache
+        self.revalidate_after = revalidate_after
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        # (session_id, op), in the order the writes were made
+        self._pending: List[Tuple[str, object]] = []
+        # session_id → {"version", "turns", "fields"} as this worker last wrote or read it
+        self._synced: Dict[str, Dict] = {}
+        self._checked_at: Dict[str, float] = {}
+        self._flush_lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._flush_task: Optional[asyncio.Task] = None
+        self.stats = {"db_reads": 0, "db_misses": 0, "revalidations": 0, "stale_cache": 0,
+                      "writes": 0, "flushes": 0, "retries": 0, "write_errors": 0}
+
+    def _collection(self):
+        return get_database()[SESSIONS_COLLECTION]
+
+    async def start(self) -> None:
+        ttl_index = IndexModel([("updated_at", ASCENDING)], name="updated_at_ttl",
+                               expireAfterSeconds=int(self.idle_ttl))
+        try:
+            await self._collection().create_indexes([ttl_index])
+        except OperationFailure as e:
+            # Usually an existing TTL index with a different expiry
+            logger.warning(f"Could not create session TTL index: {e}")
+        await self.cache.start()
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        self._flush_task = None
+        await self.flush()
+        await self.cache.stop()
+
+    async def get(self, session_id: str) -> Optional[Dict]:
+        session = await self.cache.get(session_id)
+        if session is not None and session_id in self._synced:
+            if time.monotonic() - self._checked_at.get(session_id, 0.0) < self.revalidate_after:
+                return session
+            if self._has_pending(session_id):
+                await self.flush()  # compare against our own writes, not behind them
+            synced = self._synced.get(session_id)
+            self.stats["revalidations"] += 1
+            doc = await self._collection().find_one({"_id": session_id}, {"version": 1})
+            if doc is not None and synced is not None and doc.get("version", 0) == synced["version"]:
+                self._checked_at[session_id] = time.monotonic()
+                return session
+            # Another worker wrote (or the session expired) — re-read below
+            self.stats["stale_cache"] += 1
+        elif self._has_pending(session_id):
+            await self.flush()
+        return await self._load(session_id)
+
+    async def _load(self, session_id: str) -> Optional[Dict]:
+        self.stats["db_reads"] += 1
+        doc = await self._collection().find_one({"_id": session_id})
+        if doc is None:
+            await self._forget(session_id)
+            self.stats["db_misses"] += 1
+            return None
+
+        for key in ("_id", "updated_at", "ops"):
+            doc.pop(key, None)
+        version = doc.pop("version", 0)
+        doc["conversation"] = [Turn.from_record(r) for r in doc.get("conversation", [])]
+        self._synced[session_id] = {
+            "version": version,
+            "turns": len(doc["conversation"]),
+            "fields": {k: _fingerprint(v) for k, v in doc.items() if k != "conversation"},
+        }
+        self._checked_at[session_id] = time.monotonic()
+        await self.cache.put(session_id, doc)
+        return doc
+
+    async def put(self, session_id: str, session: Dict) -> None:
+        conversation = session.get("conversation", [])
+        fields = {k: v for k, v in session.items() if k != "conversation"}
+        fingerprints = {k: _fingerprint(v) for k, v in fields.items()}
+        now = datetime.utcnow()
+        synced = self._synced.get(session_id)
+
+        if synced is None:
+            # New session: idempotent insert, written before we return
+            version = 1
+            op = UpdateOne(
+                {"_id": session_id},
+                {"$setOnInsert": {**fields, "version": version, "ops": [],
+                                  "conversation": [t.to_record() for t in conversation]},
+                 "$set": {"updated_at": now}},
+                upsert=True,
+            )
+            self._checked_at[session_id] = time.monotonic()
+        else:
+            version = synced["version"] + 1
+            op_id = uuid.uuid4().hex
+            changed = {k: fields[k] for k, fp in fingerprints.items() if synced["fields"].get(k) != fp}
+            update = {
+                "$set": {**changed, "updated_at": now},
+                "$inc": {"version": 1},
+                "$push": {"ops": {"$each": [op_id], "$slice": -OPS_KEPT}},
+            }
+            removed = [k for k in synced["fields"] if k not in fields]
+            if removed:
+                update["$unset"] = {k: "" for k in removed}
+            if len(conversation) > synced["turns"]:
+                new_turns = [t.to_record() for t in conversation[synced["turns"]:]]
+                update["$push"]["conversation"] = {"$each": new_turns}
+            elif len(conversation) < synced["turns"]:
+                update["$set"]["conversation"] = [t.to_record() for t in conversation]
+            # Skipped if a retry of this same op already applied
+            op = UpdateOne({"_id": session_id, "ops": {"$ne": op_id}}, update)
+
+        self._pending.append((session_id, op))
+        self._synced[session_id] = {"version": version, "turns": len(conversation), "fields": fingerprints}
+        await self.cache.put(session_id, session)
+        if synced is None:
+            await self.flush()
+        elif len(self._pending) >= self.batch_size:
+            self._wake.set()
+
+    async def delete(self, session_id: str) -> None:
+        await self._forget(session_id)
+        self._pending = [(s, op) for s, op in self._pending if s != session_id]
+        self._pending.append((session_id, DeleteOne({"_id": session_id})))
+        await self.flush()
+
+    def _has_pending(self, session_id: str) -> bool:
+        return any(s == session_id for s, _ in self._pending)
+
+    async def _forget(self, session_id: str) -> None:
+        """Drop local state so the next get() re-reads MongoDB."""
+        await self.cache.delete(session_id)
+        self._synced.pop(session_id, None)
+        self._checked_at.pop(session_id, None)
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            # Puts that queued while another flush ran are written here, together
+            while self._pending:
+                batch, self._pending = self._pending[:self.batch_size], self._pending[self.batch_size:]
+                if not await self._write(batch):
+                    break
+
+            # Sessions that left the cache are re-read (and re-versioned) from MongoDB
+            for session_id in [s for s in self._synced if s not in self.cache and not self._has_pending(s)]:
+                del self._synced[session_id]
+                self._checked_at.pop(session_id, None)
+
+    async def _write(self, batch: List[Tuple[str, object]]) -> bool:
+        """Write one batch; False if MongoDB is failing and the rest should wait."""
+        ops = [op for _, op in batch]
+        self.stats["flushes"] += 1
+        try:
+            # Ordered: a session's writes must apply in the order they were made
+            await self._collection().bulk_write(ops, ordered=True)
+        except BulkWriteError as e:
+            # Ops before the failing one applied; that one is rejected for good
+            # (e.g. the document would exceed 16MB), and so are the same
+            # session's later ops, which build on it
+            error = e.details["writeErrors"][0]
+            failed = error["index"]
+            session_id = batch[failed][0]
+            logger.error(f"Session write rejected for {session_id}: {error.get('errmsg')}")
+            self.stats["writes"] += failed
+            self.stats["write_errors"] += 1
+            await self._forget(session_id)
+            self._pending = [(s, op) for s, op in batch[failed + 1:] + self._pending if s != session_id]
+            return True
+        except PyMongoError as e:
+            # Nothing is known to have applied — retry the batch in order.
+            # Updates that did apply carry an op id MongoDB now has, so their
+            # retry matches nothing; inserts are $setOnInsert. Nothing is lost
+            # or written twice.
+            self.stats["retries"] += len(batch)
+            logger.error(f"Session write failed for {len(batch)} ops, retrying: {e}")
+            self._pending = batch + self._pending
+            return False
+
+        self.stats["writes"] += len(ops)
+        return True
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            if self._pending:
+                await self.flush()
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            "backend": "mongo",
+            "pending_writes": len(self._pending),
+            "cache": self.cache.get_stats(),
+        }
+
+
+def create_session_store():
+    """Session backend chosen by settings.session_backend ('memory' or 'mongo')."""
+    if settings.session_backend == "mongo":
+        return MongoSessionStore(
+            idle_ttl=settings.session_idle_ttl,
+            cache=SessionStore(
+                idle_ttl=settings.session_idle_ttl,
+                max_entries=settings.session_cache_entries,
+                max_bytes=settings.session_max_bytes,
+                sweep_interval=settings.session_sweep_interval,
+            ),
+            revalidate_after=settings.session_cache_ttl,
+            flush_interval=settings.session_flush_interval,
+            batch_size=settings.session_flush_batch,
+        )
+    return SessionStore(
+        idle_ttl=settings.session_idle_ttl,
+        max_entries=settings.session_max_entries,
+        max_bytes=settings.session_max_bytes,
+        sweep_interval=settings.session_sweep_interval,
+    )
+
+
+session_store = create_session_store()
@@ -0,0 +1,202 @@
+import re
+import logging
+from typing import Dict, List, Optional, Tuple
+from app.services.groq_service import REQUIRED_KEYS
+
+logger = logging.getLogger(__name__)
+
+SLOT_KEYS = [k.lower() for k in REQUIRED_KEYS]
+
+# Keyword rules follow the MAPPING GUIDE in groq_service.SYSTEM_PROMPTS, but
+# only for explicit statements: vague context ("AI student", "some ML work",
+# "coding") must be clarified by the LLM, so it fills nothing here.
+# Within a slot the first matching rule wins, so narrower phrases
+# ("light gaming") come before broader ones ("gaming"). Negated matches
+# ("not for gaming", "don't need 4K") are skipped — see _negated().
+KEYWORD_RULES: Dict[str, List[Tuple[str, str]]] = {
+    'gpu intensity': [
+        (r"\b(light|casual|occasional|some)\s+gam(e|ing)|\bphoto\s*editing|\bphotoshop|\blightroom", 'medium'),
+        (r"\bgam(e|es|ing|er)\b|\b3d\b|\bblender|\bvideo\s*editing|\brender(ing)?\b|"
+         r"\b(daily|heavy)\s+(model\s+)?training|\btrain(ing)? (large |deep )?models", 'high'),
+        (r"\b(no|not|don'?t|never|won'?t)\s+(do\s+)?(any\s+)?gam(e|ing)", 'low'),
+        (r"\bbasic (use|tasks|work)|\bbrowsing|\boffice work|\bms office|\bdocuments|\bemails?\b|\bnetflix|\bmovies", 'low'),
+    ],
+    'processing speed': [
+        (r"\bi[79]\b|\bryzen\s*[79]\b|\bheavy (work(loads?)?|tasks|multitasking)|\bcompil(e|ing) large", 'high'),
+        (r"\bi5\b|\bryzen\s*5\b|\bmultitasking\b", 'medium'),
+        (r"\bi3\b|\bryzen\s*3\b|\bceleron\b|\bpentium\b|\bbasic (use|tasks|work)", 'low'),
+    ],
+    'storage type': [
+        (r"\bnvme\b|\bpcie\b|\bfast(est)? storage", 'high'),
+        (r"\bsata\s*ssd\b", 'medium'),
+        # Bare "SSD" could be SATA or NVMe — the guide says pick the higher level
+        (r"\bssd\b", 'high'),
+        (r"\bhdd\b|\bhard (disk|drive)", 'low'),
+    ],
+    'display quality': [
+        (r"\b[248]k\b|\boled\b|\bqhd\b|\buhd\b|\bretina\b|\b1440p\b|\b2160p\b|\bcolou?r[- ]accura", 'high'),
+        (r"\bfull\s*hd\b|\bfhd\b|\b1080p?\b", 'medium'),
+        (r"\bhd\b|\b720p\b|\b768p?\b", 'low'),
+    ],
+    'display size': [
+        (r"\b(large|big|bigger)\s+(screen|display)", 'high'),
+        (r"\b(small|compact|smaller)\s+(screen|display|laptop)", 'low'),
+    ],
+    'portability': [
+        (r"\boccasional(ly)?\s+(travel|carry)|\bsometimes\s+(travel|carry)", 'medium'),
+        (r"\b(mostly|always|stays?)\s+(at|on)\s+(my\s+|the\s+)?(desk|home)|\bdon'?t travel|\bdesktop replacement", 'low'),
+        (r"\btravel(l?ing|s)?\s+(a lot|often|frequently)|\bfrequent(ly)?\s+travel|\blight\s*weight|\bportable\b|"
+         r"\bcarry (it )?(everywhere|daily|around)|\bcommut", 'high'),
+    ],
+    'battery life': [
+        (r"\ball[- ]day battery|\blong battery|\bgreat battery", 'high'),
+        (r"\bplugged in|\bnear (a )?(socket|charger|plug)", 'low'),
+    ],
+}
+COMPILED_RULES = {
+    slot: [(re.compile(pattern, re.IGNORECASE), level) for pattern, level in rules]
+    for slot, rules in KEYWORD_RULES.items()
+}
+
+SIZE_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(tb|gb)\b", re.IGNORECASE)
+RAM_CONTEXT_RE = re.compile(r"^\s*(of\s+)?(ram|memory)\b", re.IGNORECASE)
+STORAGE_CONTEXT_RE = re.compile(r"^\s*(of\s+)?(ssd|hdd|nvme|storage|disk|drive)\b", re.IGNORECASE)
+# 10-19.9 only, as a whole number — not the "00 in" of "80000 in total"
+INCH_RE = re.compile(r"(?<![\d.,])(1\d(?:\.\d)?)\s*(?:\"|”|''|-?\s*inch(?:es)?\b|in\b)", re.IGNORECASE)
+HOURS_RE = re.compile(r"(?<![\d.,])(\d+(?:\.\d+)?)\s*\+?\s*(?:hours|hrs|hr|h)\b", re.IGNORECASE)
+# Hours only count as battery life when the same clause is about battery
+BATTERY_CONTEXT_RE = re.compile(r"\bbattery|\bbackup\b|\bcharg(e|ing)\b|\bunplugged|\blasts?\b", re.IGNORECASE)
+NEGATION_RE = re.compile(r"\b(no|not|don'?t|doesn'?t|won'?t|never|without|isn'?t|nor)\b", re.IGNORECASE)
+CLAUSE_BREAK_RE = re.compile(r"[.,;:!?\n]|\b(but|just|however|although|though)\b", re.IGNORECASE)
+BUDGET_RE = re.compile(
+    r"(?:(under|below|budget|upto|up to|max(?:imum)?|around|within|less than|₹|rs\.?|inr)\s*(?:of|is|:)?\s*)?"
+    r"(\d[\d,]*(?:\.\d+)?)\s*(k\b|lakhs?\b|lacs?\b|l\b)?",
+    re.IGNORECASE,
+)
+
+
+def _clause_start(message: str, pos: int) -> int:
+    breaks = [m.end() for m in CLAUSE_BREAK_RE.finditer(message, 0, pos)]
+    return breaks[-1] if breaks else 0
+
+
+def _clause(message: str, start: int, end: int) -> str:
+    """The clause (between punctuation / 'but' / 'just') containing message[start:end]."""
+    following = CLAUSE_BREAK_RE.search(message, end)
+    return message[_clause_start(message, start):following.start() if following else len(message)]
+
+
+def _negated(message: str, start: int) -> bool:
+    """'Not for ML or gaming', "I don't need 4K" — a negation earlier in the same clause."""
+    return bool(NEGATION_RE.search(message, _clause_start(message, start), start))
+
+
+def _first_match(pattern: re.Pattern, message: str) -> Optional[re.Match]:
+    for match in pattern.finditer(message):
+        if not _negated(message, match.start()):
+            return match
+    return None
+
+
+def _level(value: float, high_above: float, medium_from: float) -> str:
+    if value > high_above:
+        return 'high'
+    if value >= medium_from:
+        return 'medium'
+    return 'low'
+
+
+def _extract_sizes(message: str) -> Dict[str, str]:
+    """RAM and storage capacity from '32GB RAM', '1TB SSD', '512 GB'."""
+    found = {}
+    for match in SIZE_RE.finditer(message):
+        if _negated(message, match.start()):
+            continue
+        gb = float(match.group(1)) * (1024 if match.group(2).lower() == 'tb' else 1)
+        rest = message[match.end():]
+        if RAM_CONTEXT_RE.match(rest) or (not STORAGE_CONTEXT_RE.match(rest) and gb <= 64):
+            found['ram capacity'] = 'high' if gb >= 32 else 'medium' if gb >= 12 else 'low'
+        else:
+            # >1TB=high, 512GB=medium, <512GB=low
+            found['storage capacity'] = _level(gb, high_above=1024, medium_from=512)
+    return found
+
+
+def _extract_budget(message: str) -> Optional[str]:
+    for match in BUDGET_RE.finditer(message):
+        context, number, unit = match.groups()
+        try:
+            amount = float(number.replace(',', ''))
+        except ValueError:
+            continue
+        if unit:
+            amount *= 1000 if unit.lower() == 'k' else 100000
+        elif not context and ',' not in number:
+            continue  # a bare number could be anything
+        if 10000 <= amount <= 1000000:
+            return str(int(amount))
+    return None
+
+
+class SlotExtractor:
+    """
+    Deterministic, rule-based extraction of the ten profile slots from
+    user messages, so a user who states everything up front doesn't need
+    another LLM round trip.
+    """
+
+    def __init__(self):
+        self.stats = {"messages": 0, "slots_filled": 0, "llm_turns_skipped": 0}
+
+    def extract(self, message: str) -> Dict[str, str]:
+        found: Dict[str, str] = {}
+        for slot, rules in COMPILED_RULES.items():
+            for pattern, level in rules:
+                if _first_match(pattern, message):
+                    found[slot] = level
+                    break
+
+        found.update(_extract_sizes(message))
+
+        inches = _first_match(INCH_RE, message)
+        if inches:
+            # >15.6"=high, 14-15.6"=medium, <14"=low
+            found['display size'] = _level(float(inches.group(1)), high_above=15.6, medium_from=14)
+
+        hours = next((m for m in HOURS_RE.finditer(message)
+                      if BATTERY_CONTEXT_RE.search(_clause(message, m.start(), m.end()))
+                      and not _negated(message, m.start())), None)
+        if hours:
+            # >10hrs=high, 6-10hrs=medium
+            found['battery life'] = _level(float(hours.group(1)), high_above=10, medium_from=6)
+
+        budget = _extract_budget(message)
+        if budget:
+            found['budget'] = budget
+        return found
+
+    def update(self, slots: Dict[str, str], message: str) -> bool:
+        """Merge slots found in message into slots; True if anything changed."""
+        self.stats["messages"] += 1
+        found = self.extract(message)
+        changed = {k: v for k, v in found.items() if slots.get(k) != v}
+        if changed:
+            logger.info(f"Slots from message: {changed}")
+            self.stats["slots_filled"] += len(changed)
+            slots.update(changed)
+        return bool(changed)
+
+    def is_complete(self, slots: Dict[str, str]) -> bool:
+        return all(k in slots for k in SLOT_KEYS)
+
+    def profile_message(self, slots: Dict[str, str]) -> str:
+        """Assistant reply in the exact format the system prompt asks the LLM for."""
+        self.stats["llm_turns_skipped"] += 1
+        profile = {key: slots[key.lower()] for key in REQUIRED_KEYS}
+        return f"Here's your complete profile:\n\n{profile}\n\nFinding the best laptops for you..."
+
+    def get_stats(self) -> Dict:
+        return dict(self.stats)
+
+
+slot_extractor = SlotExtractor()
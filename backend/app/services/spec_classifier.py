@@ -0,0 +1,247 @@
+import re
+import json
+import hashlib
+from typing import Dict, Optional, Tuple
+
+# Rules mirror the CLASSIFICATION RULES block of the product_map_layer prompt
+# in generate_laptop_features.py — change both together, and bump
+# CLASSIFIER_VERSION so stored features get regenerated.
+CLASSIFIER_VERSION = 1
+
+# Everything classification reads (rules or prompt). A change to any of
+# these makes a laptop's stored laptop_feature stale.
+SPEC_FIELDS = [
+    'brand', 'model_name', 'core', 'cpu_manufacturer', 'clock_speed',
+    'ram_size', 'storage_type', 'display_type', 'display_size',
+    'graphics_processor', 'screen_resolution', 'laptop_weight',
+    'average_battery_life', 'description',
+]
+
+
+def spec_hash(laptop: Dict) -> str:
+    """Stable content hash of a laptop's spec fields."""
+    specs = {f: str(laptop.get(f, '')) for f in SPEC_FIELDS}
+    return hashlib.sha256(json.dumps(specs, sort_keys=True).encode()).hexdigest()[:16]
+
+
+NUMBER_RE = r"(\d+(?:\.\d+)?)"
+RAM_RE = re.compile(NUMBER_RE + r"\s*gb", re.IGNORECASE)
+# "512GB SSD", "1TB NVMe SSD", "512 GB of storage" — but not "8GB of RAM and an SSD"
+STORAGE_SIZE_RE = re.compile(NUMBER_RE + r"\s*(tb|gb)\s+(?:of\s+)?(?:[a-z]+\s+)?(ssd|hdd|nvme|storage|drive)\b", re.IGNORECASE)
+RESOLUTION_RE = re.compile(r"(\d{3,4})\s*[x×]\s*(\d{3,4})")
+WEIGHT_RE = re.compile(NUMBER_RE + r"\s*(kg|g|lbs?)\b", re.IGNORECASE)
+INCHES_RE = re.compile(NUMBER_RE + r"\s*(?:\"|”|''|-?\s*inch(?:es)?\b|in\b)?", re.IGNORECASE)
+HOURS_RE = re.compile(NUMBER_RE + r"\s*(?:hours|hrs|hr|h)\b", re.IGNORECASE)
+CLOCK_RE = re.compile(NUMBER_RE + r"\s*(ghz|mhz)\b", re.IGNORECASE)
+GTX_MODEL_RE = re.compile(r"gtx\s*(\d{3,4})", re.IGNORECASE)
+
+
+def _number(pattern: re.Pattern, value) -> Optional[re.Match]:
+    if value is None:
+        return None
+    return pattern.search(str(value))
+
+
+def parse_ram_gb(value) -> Optional[float]:
+    """'16GB' → 16.0"""
+    m = _number(RAM_RE, value)
+    return float(m.group(1)) if m else None
+
+
+def parse_storage_gb(*values) -> Optional[float]:
+    """First '512GB SSD' / '1 TB storage' found in the given fields, in GB."""
+    for value in values:
+        m = _number(STORAGE_SIZE_RE, value)
+        if m:
+            return float(m.group(1)) * (1024 if m.group(2).lower() == 'tb' else 1)
+    return None
+
+
+def parse_resolution(value) -> Optional[Tuple[int, int]]:
+    """'1920x1080' → (1920, 1080)"""
+    m = _number(RESOLUTION_RE, value)
+    return (int(m.group(1)), int(m.group(2))) if m else None
+
+
+def parse_weight_kg(value) -> Optional[float]:
+    """'2.5 kg' → 2.5 (grams and pounds are converted)"""
+    m = _number(WEIGHT_RE, value)
+    if not m:
+        return None
+    amount, unit = float(m.group(1)), m.group(2).lower()
+    if unit == 'g':
+        return amount / 1000
+    if unit.startswith('lb'):
+        return round(amount * 0.4536, 2)
+    return amount
+
+
+def parse_display_in(value) -> Optional[float]:
+    """'15.6"' → 15.6"""
+    m = _number(INCHES_RE, value)
+    if not m:
+        return None
+    inches = float(m.group(1))
+    return inches if 7 <= inches <= 25 else None
+
+
+def parse_battery_hours(value) -> Optional[float]:
+    """'6 hours' → 6.0"""
+    m = _number(HOURS_RE, value)
+    return float(m.group(1)) if m else None
+
+
+def parse_clock_ghz(value) -> Optional[float]:
+    """'2.4 GHz' → 2.4"""
+    m = _number(CLOCK_RE, value)
+    if not m:
+        return None
+    ghz = float(m.group(1))
+    return ghz / 1000 if m.group(2).lower() == 'mhz' else ghz
+
+
+# First number in a price, after any currency token ("Rs.", "INR", "₹"),
+# with an optional lakh / thousand suffix
+PRICE_RE = re.compile(r"(\d[\d,]*(?:\.\d+)?)\s*(lakhs?|lacs?|l|k)?\b", re.IGNORECASE)
+PRICE_MULTIPLIERS = {'l': 100000, 'k': 1000}  # by first letter: l / lakh / lac, k
+
+
+def parse_price_inr(value) -> Optional[int]:
+    """'₹35,000' / 'Rs. 35,000' / 'INR 1.2L' / 35000 → rupees (None for missing or zero prices)"""
+    match = PRICE_RE.search(str(value if value is not None else ''))
+    if not match:
+        return None
+    price = float(match.group(1).replace(',', ''))
+    price = int(round(price * PRICE_MULTIPLIERS.get((match.group(2) or ' ')[0].lower(), 1)))
+    return price if price > 0 else None
+
+
+NUMERIC_SPEC_FIELDS = ['price_inr', 'ram_gb', 'weight_kg', 'display_in', 'battery_h', 'clock_ghz']
+
+
+def numeric_specs(laptop: Dict) -> Dict[str, Optional[float]]:
+    """
+    Typed copies of the display-string spec fields, stored next to them at
+    ingest so range filters and scoring never parse strings.
+    """
+    return {
+        'ram_gb': parse_ram_gb(laptop.get('ram_size')),
+        'weight_kg': parse_weight_kg(laptop.get('laptop_weight')),
+        'display_in': parse_display_in(laptop.get('display_size')),
+        'battery_h': parse_battery_hours(laptop.get('average_battery_life')),
+        'clock_ghz': parse_clock_ghz(laptop.get('clock_speed')),
+        'price_inr': parse_price_inr(laptop.get('price')),
+    }
+
+
+# ── per-feature rules ─────────────────────────────────────────────────────
+
+def classify_gpu(gpu) -> Optional[str]:
+    g = str(gpu or '').lower()
+    if not g:
+        return None
+    if 'rtx' in g or re.search(r"\brx\s*\d", g):
+        return 'high'
+    m = GTX_MODEL_RE.search(g)
+    if m:
+        return 'high' if int(m.group(1)) >= 1660 else 'medium'
+    if re.search(r"\bmx\s*\d", g) or ('radeon' in g and 'gtx' not in g):
+        return 'medium'
+    if 'intel' in g and re.search(r"\b(uhd|iris|hd)\b", g):
+        return 'low'
+    return None  # unnumbered GTX, Quadro, Apple silicon, … — ask the LLM
+
+
+def classify_cpu(core) -> Optional[str]:
+    c = str(core or '').lower()
+    if re.search(r"\bi[79]\b|ryzen\s*[79]\b|\bxeon\b", c):
+        return 'high'
+    if re.search(r"\bi5\b|ryzen\s*5\b", c):
+        return 'medium'
+    if re.search(r"\bi3\b|ryzen\s*3\b|celeron|pentium", c):
+        return 'low'
+    return None
+
+
+def classify_ram(ram) -> Optional[str]:
+    gb = parse_ram_gb(ram)
+    if gb is None:
+        return None
+    # low: 4/8GB, medium: 12/16GB, high: 24GB+
+    return 'high' if gb >= 24 else 'medium' if gb >= 12 else 'low'
+
+
+def classify_storage_capacity(*fields) -> Optional[str]:
+    gb = parse_storage_gb(*fields)
+    if gb is None:
+        return None
+    # <512GB low, 512GB–1TB medium, >1TB high
+    return 'high' if gb > 1024 else 'medium' if gb >= 512 else 'low'
+
+
+def classify_storage_type(storage) -> Optional[str]:
+    s = str(storage or '').lower()
+    if not s:
+        return None
+    if 'nvme' in s or 'pcie' in s or ('ssd' in s and 'hdd' in s):
+        return 'high'
+    if 'ssd' in s:
+        return 'medium'
+    if 'hdd' in s or 'hard' in s:
+        return 'low'
+    return None
+
+
+def classify_display_quality(resolution, display_type) -> Optional[str]:
+    t = str(display_type or '').lower()
+    if any(k in t for k in ('oled', 'retina')):
+        return 'high'
+    res = parse_resolution(resolution)
+    if res is None:
+        return None
+    height = min(res)
+    if height > 1200:       # 2K / 4K / 3K
+        return 'high'
+    if height >= 1080:      # Full HD (incl. 1920x1200)
+        return 'medium'
+    return 'low'
+
+
+def classify_display_size(display_size) -> Optional[str]:
+    inches = parse_display_in(display_size)
+    if inches is None:
+        return None
+    return 'high' if inches > 15.6 else 'medium' if inches >= 14 else 'low'
+
+
+def classify_portability(weight) -> Optional[str]:
+    kg = parse_weight_kg(weight)
+    if kg is None:
+        return None
+    # As in the prompt: <1.5kg low, 1.5–2.5kg medium, >2.5kg high
+    return 'high' if kg > 2.5 else 'medium' if kg >= 1.5 else 'low'
+
+
+def classify_battery(battery) -> Optional[str]:
+    hours = parse_battery_hours(battery)
+    if hours is None:
+        return None
+    return 'high' if hours > 10 else 'medium' if hours >= 6 else 'low'
+
+
+def classify_specs(laptop: Dict) -> Dict[str, Optional[str]]:
+    """
+    Apply the classification rules to a laptop's raw spec fields.
+    Features whose fields can't be parsed map to None.
+    """
+    return {
+        'gpu intensity': classify_gpu(laptop.get('graphics_processor')),
+        'processing speed': classify_cpu(laptop.get('core')),
+        'ram capacity': classify_ram(laptop.get('ram_size')),
+        'storage capacity': classify_storage_capacity(laptop.get('storage_type'), laptop.get('description')),
+        'storage type': classify_storage_type(laptop.get('storage_type')),
+        'display quality': classify_display_quality(laptop.get('screen_resolution'), laptop.get('display_type')),
+        'display size': classify_display_size(laptop.get('display_size')),
+        'portability': classify_portability(laptop.get('laptop_weight')),
+        'battery life': classify_battery(laptop.get('average_battery_life')),
+    }
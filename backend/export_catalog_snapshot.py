@@ -0,0 +1,37 @@
+import asyncio
+import argparse
+import time
+from app.config import get_settings
+from app.database import get_database
+from app.services.catalog_snapshot import SNAPSHOT_PROJECTION, get_catalog_version, _snapshot_doc
+from app.services.catalog_file import write_catalog_file
+
+settings = get_settings()
+
+
+async def export_catalog(path: str):
+    """Write the featured catalog to a columnar file the API memory-maps at startup"""
+    from app.database import connect_to_mongo
+
+    await connect_to_mongo()
+    db = get_database()
+
+    started = time.monotonic()
+    version = await get_catalog_version(db)
+    docs = await db.laptops.find({}, SNAPSHOT_PROJECTION).to_list(length=None)
+    laptops = [_snapshot_doc(d) for d in docs]
+    featured = sum(1 for l in laptops if l.get('laptop_feature'))
+
+    size = write_catalog_file(path, laptops, version)
+
+    print(f"\n{'='*60}")
+    print(f"✅ Exported {len(laptops)} laptops ({featured} with features) to {path}")
+    print(f"   {size / 1024:.1f} KB, catalog version {version}, {time.monotonic() - started:.1f}s")
+    print(f"{'='*60}\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the laptop catalog for memory-mapped loading")
+    parser.add_argument("--output", default=settings.catalog_snapshot_path, help="file to write")
+    args = parser.parse_args()
+    asyncio.run(export_catalog(args.output))
@@ -1,46 +1,47 @@
 import asyncio
+import argparse
+import json
+import time
+from typing import Dict, List, Optional, Tuple
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
 from app.database import get_database
-from app.services.groq_service import groq_service
+from app.services.groq_service import groq_service, normalise_value, VALID_VALUES
+from app.services.catalog_engine import SCOREABLE_FEATURES
+from app.services.context_manager import estimate_tokens
+from app.services.groq_scheduler import BATCH
+from app.services.catalog_snapshot import bump_catalog_version
+from app.services.spec_classifier import classify_specs, spec_hash, numeric_specs, CLASSIFIER_VERSION
 import re
 import ast
 
-async def product_map_layer(laptop):
-    """Use Groq to extract ALL laptop features from specs"""
-    
-    delimiter = "#####"
-    
-    # Extract all available specs
-    description = laptop.get('description', '')
-    brand = laptop.get('brand', '')
-    model = laptop.get('model_name', '')
-    cpu = f"{laptop.get('cpu_manufacturer', '')} {laptop.get('core', '')}"
-    clock = laptop.get('clock_speed', '')
-    ram = laptop.get('ram_size', '')
-    storage_type = laptop.get('storage_type', '')
-    display_type = laptop.get('display_type', '')
-    display_size = laptop.get('display_size', '')
-    gpu = laptop.get('graphics_processor', '')
-    resolution = laptop.get('screen_resolution', '')
-    weight = laptop.get('laptop_weight', '')
-    battery = laptop.get('average_battery_life', '')
-    
-    prompt = f"""
-    You are a Laptop Specifications Classifier. Analyze the laptop specifications and classify EACH feature as 'low', 'medium', or 'high'.
-    
-    LAPTOP SPECS:
-    Brand: {brand}
-    Model: {model}
-    CPU: {cpu} @ {clock}
-    RAM: {ram}
-    Storage: {storage_type}
-    Display: {display_size} {display_type} ({resolution})
-    GPU: {gpu}
-    Weight: {weight}
-    Battery: {battery}
-    Description: {description}
-    
-    {delimiter}CLASSIFICATION RULES:{delimiter}
-    
+# Bump when the prompt below changes so existing features get regenerated
+PROMPT_VERSION = 1
+FEATURE_VERSION = f"rules-{CLASSIFIER_VERSION}/prompt-{PROMPT_VERSION}"
+
+
+def stale_features_query() -> Dict:
+    """Laptops that are new, whose specs changed, or whose features came from an older classifier."""
+    return {'$or': [
+        {'laptop_feature': {'$exists': False}},
+        {'spec_hash': {'$exists': False}},
+        {'laptop_feature_meta.version': {'$ne': FEATURE_VERSION}},
+        {'$expr': {'$ne': ['$laptop_feature_meta.spec_hash', '$spec_hash']}},
+        # Seeded before numeric spec fields existed — backfilled without the LLM
+        {'price_inr': {'$exists': False}},
+    ]}
+
+
+def is_up_to_date(laptop: Dict, current_hash: str) -> bool:
+    meta = laptop.get('laptop_feature_meta') or {}
+    return (
+        'laptop_feature' in laptop
+        and meta.get('spec_hash') == current_hash
+        and meta.get('version') == FEATURE_VERSION
+    )
+
+
+CLASSIFICATION_RULES = """
     1. GPU Intensity:
        - low: Integrated graphics (Intel UHD, Intel Iris, Intel HD)
        - medium: Entry/Mid dedicated (AMD Radeon, GTX 1050-1650, MX series)
@@ -85,20 +86,117 @@ async def product_map_layer(laptop):
        - low: <6 hours
        - medium: 6-10 hours
        - high: >10 hours
+    """
+
+FEATURE_KEYS = "{'gpu intensity': 'value', 'processing speed': 'value', 'ram capacity': 'value', 'storage capacity': 'value', 'storage type': 'value', 'display quality': 'value', 'display size': 'value', 'portability': 'value', 'battery life': 'value'}"
+
+# Completion allowance per laptop in a batch prompt: one entry as the model
+# writes it, plus 50% headroom (JSON punctuation tokenizes worse than the
+# ~4 chars/token estimate, and the model may indent more)
+BATCH_ENTRY_SAMPLE = '"L100": ' + json.dumps({f: 'medium' for f in SCOREABLE_FEATURES}, indent=2) + ',\n'
+BATCH_OUTPUT_TOKENS = estimate_tokens(BATCH_ENTRY_SAMPLE) * 3 // 2
+
+
+def specs_block(laptop):
+    """The LAPTOP SPECS section shared by the single and batch prompts"""
+    cpu = f"{laptop.get('cpu_manufacturer', '')} {laptop.get('core', '')}"
+    return f"""Brand: {laptop.get('brand', '')}
+    Model: {laptop.get('model_name', '')}
+    CPU: {cpu} @ {laptop.get('clock_speed', '')}
+    RAM: {laptop.get('ram_size', '')}
+    Storage: {laptop.get('storage_type', '')}
+    Display: {laptop.get('display_size', '')} {laptop.get('display_type', '')} ({laptop.get('screen_resolution', '')})
+    GPU: {laptop.get('graphics_processor', '')}
+    Weight: {laptop.get('laptop_weight', '')}
+    Battery: {laptop.get('average_battery_life', '')}
+    Description: {laptop.get('description', '')}"""
+
+
+async def product_map_layer(laptop):
+    """Use Groq to extract ALL laptop features from specs"""
     
+    delimiter = "#####"
+    
+    prompt = f"""
+    You are a Laptop Specifications Classifier. Analyze the laptop specifications and classify EACH feature as 'low', 'medium', or 'high'.
+    
+    LAPTOP SPECS:
+    {specs_block(laptop)}
+    
+    {delimiter}CLASSIFICATION RULES:{delimiter}
+    {CLASSIFICATION_RULES}
     {delimiter}
     
     Analyze the specs above and output ONLY a Python dictionary with these EXACT 9 keys:
     
-    {{'gpu intensity': 'value', 'processing speed': 'value', 'ram capacity': 'value', 'storage capacity': 'value', 'storage type': 'value', 'display quality': 'value', 'display size': 'value', 'portability': 'value', 'battery life': 'value'}}
+    {FEATURE_KEYS}
     
     Replace 'value' with 'low', 'medium', or 'high' based on the rules above.
     Output ONLY the dictionary, no explanations.
     """
     
-    response = groq_service.get_completion(prompt)
+    response = await groq_service.get_completion(prompt, priority=BATCH)
+    return response.strip()
+
+async def product_map_batch(laptops: List[Dict]):
+    """Classify several laptops in one Groq call; entries are keyed L1..Ln"""
+    
+    delimiter = "#####"
+    
+    specs = "\n\n    ".join(f"[L{i}]\n    {specs_block(laptop)}" for i, laptop in enumerate(laptops, 1))
+    
+    prompt = f"""
+    You are a Laptop Specifications Classifier. Analyze EACH of the {len(laptops)} laptops below and classify every feature as 'low', 'medium', or 'high'.
+    
+    LAPTOPS:
+    {specs}
+    
+    {delimiter}CLASSIFICATION RULES:{delimiter}
+    {CLASSIFICATION_RULES}
+    {delimiter}
+    
+    Output ONLY a JSON object mapping each laptop ID (L1 ... L{len(laptops)}) to an object with these EXACT 9 keys:
+    
+    {FEATURE_KEYS}
+    
+    Replace 'value' with 'low', 'medium', or 'high' based on the rules above.
+    Use double quotes. Output ONLY the JSON, no explanations.
+    """
+    
+    max_tokens = BATCH_OUTPUT_TOKENS * len(laptops) + 50
+    response = await groq_service.get_completion(prompt, priority=BATCH, max_tokens=max_tokens)
     return response.strip()
 
+def estimate_batch_tokens(laptop) -> int:
+    """Prompt + completion tokens one laptop adds to a batch request"""
+    return estimate_tokens(specs_block(laptop)) + BATCH_OUTPUT_TOKENS
+
+def validate_features(features) -> Optional[Dict]:
+    """Normalised 9-feature dict, or None if anything is missing or invalid"""
+    if not isinstance(features, dict):
+        return None
+    cleaned = {str(k).strip().lower(): normalise_value(str(v)) for k, v in features.items()}
+    if set(cleaned) != set(SCOREABLE_FEATURES) or not set(cleaned.values()) <= VALID_VALUES:
+        return None
+    return cleaned
+
+def extract_batch_features(string, count: int) -> Dict[str, Optional[Dict]]:
+    """Parse a batch response into {'L1': features or None, ...}"""
+    start, end = string.find('{'), string.rfind('}')
+    parsed = {}
+    if start != -1 and end > start:
+        try:
+            parsed = json.loads(string[start:end + 1])
+        except ValueError:
+            try:
+                parsed = ast.literal_eval(string[start:end + 1])
+            except Exception as e:
+                print(f"Error parsing batch response: {e}")
+    if not isinstance(parsed, dict):
+        parsed = {}
+    parsed = {str(k).strip().upper(): v for k, v in parsed.items()}
+    return {f"L{i}": validate_features(parsed.get(f"L{i}")) for i in range(1, count + 1)}
+
 def extract_dictionary_from_string(string):
     """Extract dictionary from string"""
     regex_pattern = r"\{[^{}]+\}"
@@ -115,57 +213,339 @@ def extract_dictionary_from_string(string):
             return None
     return None
 
-async def update_all_laptop_features():
-    """Update features for all laptops in database using Groq analysis"""
+class FeaturePipeline:
+    """
+    Classifies laptops with bounded concurrency and writes results back in
+    batched bulk_write calls.
+
+    Features are computed by the local spec rules first; the LLM is only
+    asked when some spec field can't be parsed, and its answer fills just
+    those gaps. Pacing comes from groq_service.scheduler, which follows
+    Groq's rate-limit headers and keeps batch calls behind live chats.
+
+    Each update also records the spec hash and FEATURE_VERSION it was
+    computed from, so a later run only picks up laptops that are new,
+    changed or stale — and an interrupted run resumes from the last
+    flushed batch.
+
+    Laptops that do need the LLM are grouped into multi-laptop prompts
+    sized by batch_tokens, so the shared rules block is sent once per
+    group; entries that come back missing or invalid are retried with
+    the single-laptop prompt. batch_tokens=0 sends one laptop per call.
+
+    With compare=True every laptop also goes to the LLM, nothing is
+    written, and rule/LLM disagreements are collected instead.
+    """
+
+    def __init__(self, db, concurrency: int, batch_size: int, compare: bool = False, full: bool = False,
+                 batch_tokens: int = 0):
+        self.db = db
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.batch_tokens = batch_tokens
+        self.compare = compare
+        self.full = full or compare
+        # (_id, name, update, is a feature result) — so failed writes can be reported
+        self.pending: List[Tuple[object, str, UpdateOne, bool]] = []
+        self.failures: List[Dict] = []
+        self.disagreements: List[Dict] = []
+        self.success_count = 0
+        self.rules_only = 0
+        self.up_to_date = 0
+        self.single_calls = 0
+        self.batch_calls = 0
+        self.batch_fallbacks = 0
+        self.processed = 0
+        self.total = 0
+        self.started = time.monotonic()
+        self._flush_lock = asyncio.Lock()
+        # Rules block + instructions, paid once per batch prompt
+        self._prompt_tokens = estimate_tokens(CLASSIFICATION_RULES) + 150
+        self._batch: List = []
+        self._batch_used = self._prompt_tokens
+
+    async def run(self, cursor, total: int):
+        self.total = total
+        queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        workers = [asyncio.create_task(self._worker(queue)) for _ in range(self.concurrency)]
+        producer = asyncio.create_task(self._produce(cursor, queue, len(workers)))
+        tasks = [producer, *workers]
+
+        # A crashed worker would leave the producer blocked on the full queue
+        # forever, so stop everything as soon as any task fails
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                if not task.cancelled() and task.exception() is not None:
+                    print(f"❌ Feature pipeline stopped: {task.exception()!r}")
+                    raise task.exception()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        if self._batch:
+            ready, self._batch = self._batch, []
+            await self._classify_batch(ready)
+        await self.flush()
+
+    @staticmethod
+    async def _produce(cursor, queue: asyncio.Queue, workers: int):
+        async for laptop in cursor:
+            await queue.put(laptop)
+        for _ in range(workers):
+            await queue.put(None)
+
+    async def _worker(self, queue: asyncio.Queue):
+        while True:
+            laptop = await queue.get()
+            if laptop is None:
+                return
+            await self._process(laptop)
+
+    async def _process(self, laptop):
+        name = f"{laptop.get('brand', '')} {laptop.get('model_name', '')}"
+        current_hash = spec_hash(laptop)
+        try:
+            if not self.full and is_up_to_date(laptop, current_hash):
+                # Matched the query only for missing spec_hash / numeric fields
+                self.up_to_date += 1
+                derived = {'spec_hash': current_hash, **numeric_specs(laptop)}
+                missing = {k: v for k, v in derived.items() if k not in laptop or laptop[k] != v}
+                if missing:
+                    self.pending.append((laptop['_id'], name, UpdateOne({'_id': laptop['_id']}, {'$set': missing}), False))
+                self._completed()
+            else:
+                rule_features = classify_specs(laptop)
+                item = (laptop, name, rule_features, current_hash)
+                if all(v is not None for v in rule_features.values()) and not self.compare:
+                    self.rules_only += 1
+                    self._record(laptop, rule_features, current_hash)
+                elif self.batch_tokens:
+                    ready = self._add_to_batch(item)
+                    if ready:
+                        await self._classify_batch(ready)
+                else:
+                    await self._classify_single(*item)
+        except Exception as e:
+            self._fail(laptop, name, str(e), "")
+
+        if len(self.pending) >= self.batch_size:
+            await self.flush()
+
+    def _completed(self):
+        """Count a laptop once it's recorded or failed (batched ones finish later)."""
+        self.processed += 1
+        if self.processed % max(1, self.total // 20) == 0 or self.processed == self.total:
+            self.report()
+
+    def _add_to_batch(self, item) -> Optional[List]:
+        """Queue a laptop for a batch prompt; returns the previous batch once the token budget is full."""
+        tokens = estimate_batch_tokens(item[0])
+        ready = None
+        if self._batch and self._batch_used + tokens > self.batch_tokens:
+            ready, self._batch, self._batch_used = self._batch, [], self._prompt_tokens
+        self._batch.append(item)
+        self._batch_used += tokens
+        return ready
+
+    async def _classify_batch(self, items: List):
+        if len(items) == 1:
+            await self._classify_single(*items[0])
+            return
+
+        self.batch_calls += 1
+        try:
+            response = await product_map_batch([laptop for laptop, _, _, _ in items])
+        except Exception as e:
+            for laptop, name, _, _ in items:
+                self._fail(laptop, name, f"batch request failed: {e}", "")
+            return
+        results = extract_batch_features(response, len(items))
+
+        retry = []
+        for i, (laptop, name, rule_features, current_hash) in enumerate(items, 1):
+            llm_features = results[f"L{i}"]
+            if llm_features is None:
+                retry.append((laptop, name, rule_features, current_hash))
+            else:
+                self._record(laptop, self._merge(laptop, name, rule_features, llm_features), current_hash)
+
+        if retry:
+            self.batch_fallbacks += len(retry)
+            print(f"  ↩️  {len(retry)}/{len(items)} batch entries invalid, retrying them one by one")
+            await asyncio.gather(*(self._classify_single(*item) for item in retry))
+
+    async def _classify_single(self, laptop, name: str, rule_features: Dict, current_hash: str):
+        try:
+            self.single_calls += 1
+            features_str = await product_map_layer(laptop)
+            llm_features = validate_features(extract_dictionary_from_string(features_str))
+            if llm_features is None:
+                self._fail(laptop, name, "Invalid dictionary (need 9 features, each low/medium/high)", features_str)
+                return
+            self._record(laptop, self._merge(laptop, name, rule_features, llm_features), current_hash)
+        except Exception as e:
+            self._fail(laptop, name, str(e), "")
+
+    def _merge(self, laptop, name: str, rule_features: Dict, llm_features: Dict) -> Dict:
+        for feature, rule_value in rule_features.items():
+            if rule_value is not None and llm_features.get(feature) != rule_value:
+                self.disagreements.append({
+                    '_id': str(laptop['_id']),
+                    'name': name,
+                    'feature': feature,
+                    'rules': rule_value,
+                    'llm': llm_features.get(feature),
+                })
+
+        # Parsed fields come from the rules; the LLM only fills the gaps
+        return {**llm_features, **{k: v for k, v in rule_features.items() if v is not None}}
+
+    def _record(self, laptop, features_dict: Dict, current_hash: str):
+        if not self.compare:
+            name = f"{laptop.get('brand', '')} {laptop.get('model_name', '')}"
+            self.pending.append((laptop['_id'], name, UpdateOne(
+                {'_id': laptop['_id']},
+                {'$set': {
+                    'laptop_feature': features_dict,
+                    'spec_hash': current_hash,
+                    **numeric_specs(laptop),
+                    'laptop_feature_meta': {'spec_hash': current_hash, 'version': FEATURE_VERSION},
+                }}
+            ), True))
+        self.success_count += 1
+        self._completed()
+
+    def _fail(self, laptop, name: str, error: str, response: str):
+        print(f"  ❌ {name}: {error}")
+        self.failures.append({
+            '_id': str(laptop['_id']),
+            'name': name,
+            'error': error,
+            'response': response[:500],
+        })
+        self._completed()
+
+    async def flush(self):
+        async with self._flush_lock:
+            if not self.pending:
+                return
+            batch, self.pending = self.pending, []
+            try:
+                result = await self.db.laptops.bulk_write([op for _, _, op, _ in batch], ordered=False)
+            except BulkWriteError as e:
+                # Unordered: everything not listed in writeErrors was applied
+                errors = {err['index']: err.get('errmsg', 'write error') for err in e.details.get('writeErrors', [])}
+                self._write_failed([(batch[i], msg) for i, msg in errors.items()])
+                print(f"  💾 Wrote {e.details.get('nModified', 0)}/{len(batch)} feature updates, {len(errors)} rejected")
+            except PyMongoError as e:
+                self._write_failed([(item, str(e)) for item in batch])
+                print(f"  ❌ bulk_write of {len(batch)} feature updates failed: {e}")
+            else:
+                print(f"  💾 Wrote {result.modified_count}/{len(batch)} feature updates")
+
+    def _write_failed(self, failed: List):
+        """Record unwritten updates as failures — the next run picks these laptops up again."""
+        for (laptop_id, name, _, is_feature), error in failed:
+            if is_feature:
+                self.success_count -= 1
+            self.failures.append({
+                '_id': str(laptop_id),
+                'name': name,
+                'error': f"write failed: {error}",
+                'response': '',
+            })
+
+    def report(self):
+        elapsed = time.monotonic() - self.started
+        rate = self.processed / elapsed * 60 if elapsed else 0.0
+        remaining = self.total - self.processed
+        eta = remaining / rate if rate else 0.0
+        groq = groq_service.scheduler.get_stats()
+        print(
+            f"[{self.processed}/{self.total}] {rate:.1f} laptops/min, ETA {eta:.1f} min | "
+            f"✅ {self.success_count} ({self.rules_only} rules only) ⏭️ {self.up_to_date} ❌ {len(self.failures)} | "
+            f"LLM calls: {self.batch_calls} batch, {self.single_calls} single | "
+            f"Groq: {groq['requests_last_minute']} req, {groq['tokens_last_minute']} tokens in last minute, "
+            f"{groq['retries']} retries"
+        )
+
+
+async def update_all_laptop_features(concurrency: int = 4, batch_size: int = 50,
+                                     failures_path: str = "feature_failures.json",
+                                     compare_path: Optional[str] = None, full: bool = False,
+                                     batch_tokens: int = 2500):
+    """Update features for new, changed or stale laptops using the spec rules and Groq"""
     from app.database import connect_to_mongo
-    
+
     await connect_to_mongo()
     db = get_database()
-    
-    laptops = await db.laptops.find().to_list(length=None)
-    
+
+    compare = compare_path is not None
+    query = {} if full or compare else stale_features_query()
+    catalog_size = await db.laptops.count_documents({})
+    total = await db.laptops.count_documents(query)
+
     print(f"\n{'='*60}")
-    print(f"Found {len(laptops)} laptops. Generating features using Groq AI...")
+    print(f"{total} of {catalog_size} laptops need features ({FEATURE_VERSION}). Generating...")
+    print(f"Concurrency: {concurrency}, bulk write batch: {batch_size}, prompt batch: {batch_tokens or 'off'} tokens")
     print(f"{'='*60}\n")
-    
-    success_count = 0
-    fail_count = 0
-    
-    for i, laptop in enumerate(laptops):
-        print(f"[{i+1}/{len(laptops)}] Processing: {laptop['brand']} {laptop['model_name']}")
-        
-        try:
-            # Generate features using Groq
-            features_str = await product_map_layer(laptop)
-            print(f"  Generated: {features_str[:100]}...")
-            
-            # Extract dictionary
-            features_dict = extract_dictionary_from_string(features_str)
-            
-            if features_dict and len(features_dict) == 9:
-                # Update in database
-                await db.laptops.update_one(
-                    {'_id': laptop['_id']},
-                    {'$set': {'laptop_feature': features_dict}}
-                )
-                print(f"  ✅ Updated successfully")
-                success_count += 1
-            else:
-                print(f"  ❌ Failed - Invalid dictionary (got {len(features_dict) if features_dict else 0} keys, need 9)")
-                fail_count += 1
-            
-            # Delay to avoid rate limiting
-            await asyncio.sleep(2)
-            
-        except Exception as e:
-            print(f"  ❌ Error: {e}")
-            fail_count += 1
-    
+
+    pipeline = FeaturePipeline(db, concurrency, batch_size, compare=compare, full=full, batch_tokens=batch_tokens)
+    try:
+        await pipeline.run(db.laptops.find(query), total)
+    finally:
+        # Keep whatever was classified before an interruption
+        await pipeline.flush()
+
+        if pipeline.failures:
+            with open(failures_path, "w") as f:
+                json.dump(pipeline.failures, f, indent=2)
+            print(f"\n📝 Wrote {len(pipeline.failures)} failures to {failures_path}")
+
+    if compare_path is not None:
+        print_comparison_report(pipeline, compare_path)
+    elif pipeline.success_count:
+        await bump_catalog_version(db)
+
+    elapsed = time.monotonic() - pipeline.started
     print(f"\n{'='*60}")
-    print(f"Feature generation complete!")
-    print(f"✅ Success: {success_count}")
-    print(f"❌ Failed: {fail_count}")
+    print(f"Feature generation complete in {elapsed:.1f}s!")
+    print(f"✅ Success: {pipeline.success_count} ({pipeline.rules_only} without an LLM call)")
+    print(f"⏭️  Already up to date: {pipeline.up_to_date}")
+    print(f"🤖 LLM calls: {pipeline.batch_calls} batch, {pipeline.single_calls} single "
+          f"({pipeline.batch_fallbacks} batch entries retried alone)")
+    print(f"❌ Failed: {len(pipeline.failures)}")
     print(f"{'='*60}\n")
 
+def print_comparison_report(pipeline: FeaturePipeline, path: str):
+    """Per-feature count of laptops where the spec rules and the LLM disagree."""
+    by_feature: Dict[str, int] = {}
+    for d in pipeline.disagreements:
+        by_feature[d['feature']] = by_feature.get(d['feature'], 0) + 1
+
+    print(f"\n{'='*60}")
+    print(f"Rules vs LLM on {pipeline.success_count} laptops (no changes written)")
+    for feature, count in sorted(by_feature.items(), key=lambda kv: -kv[1]):
+        print(f"  {feature:<18} {count} disagreements")
+    if not by_feature:
+        print("  ✅ Rules and LLM agree on every parsed feature")
+
+    with open(path, "w") as f:
+        json.dump(pipeline.disagreements, f, indent=2)
+    print(f"📝 Wrote {len(pipeline.disagreements)} disagreements to {path}")
+
 if __name__ == "__main__":
-    asyncio.run(update_all_laptop_features())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Generate laptop_feature levels with Groq")
+    parser.add_argument("--concurrency", type=int, default=4, help="laptops classified in parallel")
+    parser.add_argument("--batch-size", type=int, default=50, help="updates per bulk_write")
+    parser.add_argument("--failures", default="feature_failures.json", help="where to write the failure list")
+    parser.add_argument("--compare", nargs="?", const="feature_disagreements.json", metavar="PATH",
+                        help="dry run: classify with rules AND the LLM and report disagreements")
+    parser.add_argument("--full", action="store_true", help="reprocess every laptop, not just new/changed/stale ones")
+    parser.add_argument("--batch-tokens", type=int, default=2500,
+                        help="token budget per multi-laptop prompt (0 = one laptop per prompt)")
+    args = parser.parse_args()
+    asyncio.run(update_all_laptop_features(args.concurrency, args.batch_size, args.failures, args.compare,
+                                           args.full, args.batch_tokens))
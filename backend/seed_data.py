@@ -1,73 +1,164 @@
+import argparse
+import time
+import uuid
 import pandas as pd
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
+from pymongo.errors import BulkWriteError
 from dotenv import load_dotenv
+from app.indexes import LAPTOP_INDEXES
+from app.services.spec_classifier import spec_hash, numeric_specs, parse_price_inr
 import os
 
 load_dotenv()
 
-# Connect to MongoDB
-client = MongoClient(os.getenv("MONGODB_URL"))
-db = client[os.getenv("DATABASE_NAME")]
+# CSV column → document field
+FIELD_MAP = {
+    'Brand': 'brand',
+    'Model Name': 'model_name',
+    'Core': 'core',
+    'CPU Manufacturer': 'cpu_manufacturer',
+    'Clock Speed': 'clock_speed',
+    'RAM Size': 'ram_size',
+    'Storage Type': 'storage_type',
+    'Display Type': 'display_type',
+    'Display Size': 'display_size',
+    'Graphics Processor': 'graphics_processor',
+    'Screen Resolution': 'screen_resolution',
+    'OS': 'os',
+    'Laptop Weight': 'laptop_weight',
+    'Special Features': 'special_features',
+    'Warranty': 'warranty',
+    'Average Battery Life': 'average_battery_life',
+}
 
-print("=" * 60)
-print("LAPTOP DATABASE SEEDING")
-print("=" * 60)
+# Brand + model + configuration identifies a SKU across feeds
+SKU_FIELDS = ['brand', 'model_name', 'core', 'ram_size', 'storage_type', 'graphics_processor', 'display_size']
 
-# Read CSV
-print("\n[1] Reading CSV file...")
-df = pd.read_csv('laptop_data2.csv')
-print(f"✅ Found {len(df)} laptops in CSV")
 
-# Convert to dict
-laptops = df.to_dict('records')
+def sku_key(laptop):
+    # Empty CSV cells come through as NaN — key them as "", not "nan"
+    values = ('' if pd.isna(v) else v for v in (laptop.get(f, '') for f in SKU_FIELDS))
+    return "|".join(str(v).strip().lower() for v in values)
 
-# Clean and prepare data
-print("\n[2] Cleaning and preparing data...")
-for i, laptop in enumerate(laptops):
+
+def clean_row(row, row_number):
+    """CSV row → laptop document (without laptop_feature)"""
     # Convert price to int
-    try:
-        laptop['price'] = int(str(laptop['Price']).replace(',', ''))
-        del laptop['Price']
-    except:
-        print(f"⚠️ Warning: Could not parse price for laptop {i+1}")
-        laptop['price'] = 0
-    
+    price = parse_price_inr(row.get('Price'))
+    if price is None:
+        print(f"⚠️ Warning: Could not parse price for laptop {row_number}")
+
     # Rename fields to lowercase with underscores
-    laptop['brand'] = laptop.pop('Brand', 'Unknown')
-    laptop['model_name'] = laptop.pop('Model Name', 'Unknown')
-    laptop['core'] = laptop.pop('Core', 'Unknown')
-    laptop['cpu_manufacturer'] = laptop.pop('CPU Manufacturer', 'Unknown')
-    laptop['clock_speed'] = laptop.pop('Clock Speed', 'Unknown')
-    laptop['ram_size'] = laptop.pop('RAM Size', 'Unknown')
-    laptop['storage_type'] = laptop.pop('Storage Type', 'Unknown')
-    laptop['display_type'] = laptop.pop('Display Type', 'Unknown')
-    laptop['display_size'] = laptop.pop('Display Size', 'Unknown')
-    laptop['graphics_processor'] = laptop.pop('Graphics Processor', 'Unknown')
-    laptop['screen_resolution'] = laptop.pop('Screen Resolution', 'Unknown')
-    laptop['os'] = laptop.pop('OS', 'Unknown')
-    laptop['laptop_weight'] = laptop.pop('Laptop Weight', 'Unknown')
-    laptop['special_features'] = laptop.pop('Special Features', 'Unknown')
-    laptop['warranty'] = laptop.pop('Warranty', 'Unknown')
-    laptop['average_battery_life'] = laptop.pop('Average Battery Life', 'Unknown')
-    laptop['description'] = laptop.pop('Description', '')
-    
+    laptop = {field: row.get(column, 'Unknown') for column, field in FIELD_MAP.items()}
+    laptop['price'] = price or 0
+    laptop['description'] = row.get('Description', '')
+
+    # Lets generate_laptop_features.py skip laptops whose specs haven't changed
+    laptop['spec_hash'] = spec_hash(laptop)
+    laptop['sku_key'] = sku_key(laptop)
+
+    # Typed copies (ram_gb, weight_kg, ..., price_inr) — strings stay for display
+    laptop.update(numeric_specs(laptop))
+
     # DO NOT add laptop_feature here - it will be generated by Groq later
+    return laptop
+
+
+def backfill_sku_keys(db, batch_size):
+    """
+    Key documents loaded before sku_key existed, so the upserts below update
+    them (keeping their laptop_feature) instead of inserting fresh copies
+    while the stale-SKU sweep deletes the originals.
+    """
+    ops = [
+        UpdateOne({'_id': doc['_id']}, {'$set': {'sku_key': sku_key(doc)}})
+        for doc in db.laptops.find({'sku_key': {'$exists': False}}, {f: 1 for f in SKU_FIELDS})
+    ]
+    keyed = duplicates = 0
+    for i in range(0, len(ops), batch_size):
+        try:
+            keyed += db.laptops.bulk_write(ops[i:i + batch_size], ordered=False).modified_count
+        except BulkWriteError as e:
+            # Another document already has this key — the copy stays unkeyed
+            # and is swept as stale once the feed has loaded
+            keyed += e.details['nModified']
+            duplicates += len(e.details['writeErrors'])
+    return keyed, duplicates
+
+
+def ingest(db, csv_path, chunk_size, batch_size):
+    """
+    Stream the CSV into db.laptops in chunks, upserting on sku_key.
+
+    Existing documents keep their laptop_feature (spec changes are picked up
+    by spec_hash), so the catalog stays queryable throughout. Rows missing
+    from this feed are deleted only after every chunk has loaded.
+    """
+    run_id = uuid.uuid4().hex[:12]
+    db.laptops.create_indexes(LAPTOP_INDEXES)
+
+    keyed, duplicates = backfill_sku_keys(db, batch_size)
+    if keyed or duplicates:
+        print(f"🔑 Keyed {keyed} existing laptops by SKU ({duplicates} duplicates left to be swept)")
+
+    started = time.monotonic()
+    rows = upserted = modified = 0
+
+    print(f"\n[1] Streaming {csv_path} (ingest run {run_id})...")
+    for chunk in pd.read_csv(csv_path, chunksize=chunk_size):
+        ops = []
+        for record in chunk.to_dict('records'):
+            rows += 1
+            laptop = clean_row(record, rows)
+            laptop['ingest_run'] = run_id
+            ops.append(UpdateOne({'sku_key': laptop['sku_key']}, {'$set': laptop}, upsert=True))
+
+        for i in range(0, len(ops), batch_size):
+            result = db.laptops.bulk_write(ops[i:i + batch_size], ordered=False)
+            upserted += result.upserted_count
+            modified += result.modified_count
+
+        elapsed = time.monotonic() - started
+        print(f"  📦 {rows} rows ({rows / elapsed:.0f} rows/s) — {upserted} new, {modified} updated")
+
+    print(f"✅ Loaded {rows} rows")
+
+    # Only now is it safe to drop SKUs that are no longer in the feed
+    print("\n[2] Removing laptops missing from this feed...")
+    result = db.laptops.delete_many({'ingest_run': {'$ne': run_id}})
+    print(f"✅ Deleted {result.deleted_count} stale laptops")
+
+    # Let running API workers without change streams know the catalog changed
+    db.catalog_meta.update_one(
+        {'_id': 'laptops'},
+        {'$inc': {'version': 1}, '$set': {'ingest_run': run_id}},
+        upsert=True,
+    )
+
+    elapsed = time.monotonic() - started
+    print(f"\n⏱️  {rows} rows in {elapsed:.1f}s ({rows / elapsed if elapsed else 0:.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import the laptop CSV into MongoDB")
+    parser.add_argument("--csv", default="laptop_data2.csv", help="CSV file to import")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="CSV rows read at a time")
+    parser.add_argument("--batch-size", type=int, default=1000, help="upserts per bulk_write")
+    args = parser.parse_args()
 
-print(f"✅ Data cleaned successfully")
+    # Connect to MongoDB
+    client = MongoClient(os.getenv("MONGODB_URL"))
+    db = client[os.getenv("DATABASE_NAME")]
 
-# Clear existing data
-print("\n[3] Clearing existing data from database...")
-result = db.laptops.delete_many({})
-print(f"✅ Deleted {result.deleted_count} existing laptops")
+    print("=" * 60)
+    print("LAPTOP DATABASE SEEDING")
+    print("=" * 60)
 
-# Insert data WITHOUT laptop_feature
-print("\n[4] Inserting new laptop data...")
-result = db.laptops.insert_many(laptops)
-print(f"✅ Inserted {len(result.inserted_ids)} laptops into MongoDB")
+    ingest(db, args.csv, args.chunk_size, args.batch_size)
 
-print("\n" + "=" * 60)
-print("SEEDING COMPLETE!")
-print("=" * 60)
-print("\n⚠️ IMPORTANT: Laptop features not generated yet!")
-print("Next step: Run 'python generate_laptop_features.py' to generate features using Groq AI")
-print("=" * 60)
\ No newline at end of file
+    print("\n" + "=" * 60)
+    print("SEEDING COMPLETE!")
+    print("=" * 60)
+    print("\n⚠️ IMPORTANT: New or changed laptops need features!")
+    print("Next step: Run 'python generate_laptop_features.py' to generate features using Groq AI")
+    print("=" * 60)
@@ -0,0 +1,6 @@
+import os
+
+# Settings are required at import time; tests never reach these services
+os.environ.setdefault("MONGODB_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DATABASE_NAME", "laptop_test")
+os.environ.setdefault("GROQ_API_KEY", "test")
@@ -0,0 +1,113 @@
+import random
+
+import pytest
+
+from app.services.catalog_engine import CatalogEngine, SCOREABLE_FEATURES
+from app.services.catalog_file import MappedCatalogEngine, write_catalog_file
+
+LEVEL_VALUES = ['low', 'medium', 'high', 'Low', 'MEDIUM', 'High', 'unknown', '']
+
+
+def reference_rank(laptops, user_req, budget, k=3):
+    """The per-laptop loop CatalogEngine replaced (before the score ≥ 5 filter)."""
+    mappings = {'low': 0, 'medium': 1, 'high': 2}
+    filtered = []
+    for laptop in laptops:
+        try:
+            if int(str(laptop['price']).replace(',', '')) <= budget:
+                filtered.append(dict(laptop))
+        except Exception:
+            continue
+
+    for laptop in filtered:
+        score = 0
+        laptop_feature = laptop.get('laptop_feature', {})
+        match_details = {}
+        if not laptop_feature:
+            laptop['score'] = 0
+            laptop['match_details'] = {}
+            continue
+        for feature in SCOREABLE_FEATURES:
+            user_val = str(user_req.get(feature, 'low')).lower()
+            laptop_val = str(laptop_feature.get(feature, 'low')).lower()
+            if mappings.get(laptop_val, 0) >= mappings.get(user_val, 0):
+                score += 1
+                match_details[feature] = f"✅ {laptop_val} (need: {user_val})"
+            else:
+                match_details[feature] = f"❌ {laptop_val} (need: {user_val})"
+        laptop['score'] = score
+        laptop['match_details'] = match_details
+
+    filtered.sort(key=lambda x: x.get('score', 0), reverse=True)
+    return filtered[:k], len(filtered)
+
+
+def random_laptop(rng, i):
+    price = rng.randrange(20000, 200000, 500)
+    laptop = {
+        '_id': f"id{i}",
+        'brand': rng.choice(['HP', 'Dell', 'Asus', 'Lenovo']),
+        'model_name': f"Model {i}",
+        'price': rng.choice([price, str(price), f"{price:,}", 'N/A']),
+    }
+    roll = rng.random()
+    if roll < 0.1:
+        pass  # never classified
+    elif roll < 0.15:
+        laptop['laptop_feature'] = {}
+    else:
+        # Some features missing, odd casing and invalid values included
+        laptop['laptop_feature'] = {
+            f: rng.choice(LEVEL_VALUES) for f in SCOREABLE_FEATURES if rng.random() < 0.9
+        }
+    return laptop
+
+
+def random_profile(rng):
+    profile = {f: rng.choice(LEVEL_VALUES) for f in SCOREABLE_FEATURES if rng.random() < 0.95}
+    budget = rng.randrange(10000, 220000, 1000)
+    profile['budget'] = str(budget)
+    return profile, budget
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_rank_matches_reference_loop(seed):
+    rng = random.Random(seed)
+    laptops = [random_laptop(rng, i) for i in range(rng.randrange(1, 400))]
+    engine = CatalogEngine.from_laptops(laptops)
+
+    for _ in range(25):
+        profile, budget = random_profile(rng)
+        expected, expected_count = reference_rank(laptops, profile, budget)
+        top, within_budget = engine.rank(profile, budget)
+
+        assert within_budget == expected_count
+        assert [l['_id'] for l in top] == [l['_id'] for l in expected]
+        assert [l['score'] for l in top] == [l['score'] for l in expected]
+        assert [l['match_details'] for l in top] == [l['match_details'] for l in expected]
+
+
+def test_rank_ties_keep_catalog_order():
+    laptops = [
+        {'_id': str(i), 'price': 50000, 'laptop_feature': {f: 'high' for f in SCOREABLE_FEATURES}}
+        for i in range(10)
+    ]
+    top, _ = CatalogEngine.from_laptops(laptops).rank({'budget': '60000'}, 60000)
+    assert [l['_id'] for l in top] == ['0', '1', '2']
+
+
+def test_mapped_engine_matches_in_memory(tmp_path):
+    rng = random.Random(42)
+    laptops = [random_laptop(rng, i) for i in range(300)]
+    path = str(tmp_path / "catalog.bin")
+    write_catalog_file(path, laptops, source_version=7)
+
+    engine = CatalogEngine.from_laptops(laptops)
+    mapped = MappedCatalogEngine(path)
+    assert mapped.source_version == 7
+    assert len(mapped) == len(engine)
+
+    for _ in range(50):
+        profile, budget = random_profile(rng)
+        assert mapped.rank(profile, budget) == engine.rank(profile, budget)
+        assert mapped.price_breakpoint(budget) == engine.price_breakpoint(budget)
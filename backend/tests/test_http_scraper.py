@@ -0,0 +1,160 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qs
+
+import pytest
+
+from app.config import settings
+from app.services import scraper_service
+from app.services.scrapers.base import ScraperBackend
+from app.services.scrapers.http_backend import HttpBackend, parse_results
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+# (site path prefix, search query) → (status, fixture file)
+PAGES = {
+    ("/flipkart/search", "hp victus"): (200, "flipkart_search.html"),
+    ("/flipkart/search", "no such laptop"): (200, "empty_search.html"),
+}
+
+
+class StubSiteHandler(BaseHTTPRequestHandler):
+    """Serves the saved search pages; any other search is a 503 (blocked/overloaded site)."""
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query).get("q", [""])[0]
+        status, fixture = PAGES.get((url.path, query), (503, None))
+        body = (FIXTURES / fixture).read_bytes() if fixture else b"Service Unavailable"
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubSiteHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def stub_sites(stub_server, monkeypatch):
+    monkeypatch.setattr(settings, "flipkart_base_url", f"{stub_server}/flipkart")
+    monkeypatch.setattr(settings, "croma_base_url", f"{stub_server}/croma")
+    return stub_server
+
+
+def scrape(backend, site, laptop_name):
+    async def run():
+        try:
+            return await backend.scrape(site, laptop_name)
+        finally:
+            await backend.close()
+    return asyncio.run(run())
+
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        ScraperBackend()
+
+
+def test_parse_flipkart_results(stub_sites):
+    html = (FIXTURES / "flipkart_search.html").read_text(encoding="utf-8")
+    results = parse_results("flipkart", html, "hp victus")
+
+    # Nameless sponsored tile skipped; capped at three
+    assert [r["name"][:28] for r in results] == [
+        "HP Victus Intel Core i5 12th",
+        "HP Victus AMD Ryzen 5 Hexa C",
+        "HP Victus 16 (Coming Soon)",
+    ]
+    assert all(len(r["name"]) <= 80 for r in results)
+    assert [r["price"] for r in results] == ["₹52,990", "₹46,490", "N/A"]
+    # Relative links resolve against the site, absolute ones are kept
+    assert results[0]["link"].startswith(f"{stub_sites}/flipkart/hp-victus-15-fa1351tx-gaming-laptop/p/")
+    assert results[1]["link"].startswith("https://www.flipkart.com/hp-victus-ryzen-5/p/")
+    # No product link → the search page
+    assert results[2]["link"] == f"{stub_sites}/flipkart/search?q=hp+victus"
+
+
+def test_parse_croma_results(stub_sites):
+    # Croma's rendered DOM (as Selenium sees it) — the HTTP backend never
+    # gets this HTML, but both backends share the selectors
+    html = (FIXTURES / "croma_search.html").read_text(encoding="utf-8")
+    results = parse_results("croma", html, "hp victus")
+
+    assert [r["price"] for r in results] == ["₹56,990", "₹74,990", "N/A"]
+    # First /p/ anchor, not the compare link
+    assert results[0]["link"] == (
+        f"{stub_sites}/croma/hp-victus-15-fa1350tx-intel-core-i5-12th-gen-gaming-laptop/p/305871"
+    )
+    assert results[2]["name"] == "HP Victus 16 (Out of stock)"
+    assert results[2]["link"] == f"{stub_sites}/croma/searchB?q=hp%20victus"
+
+
+def test_scrape_from_stub_site(stub_sites):
+    backend = HttpBackend()
+    results = scrape(backend, "flipkart", "hp victus")
+
+    assert len(results) == 3
+    assert results[0]["price"] == "₹52,990"
+    assert backend.get_stats()["requests"] == 1
+    assert backend.get_stats()["failures"] == 0
+
+
+def test_scrape_empty_page(stub_sites):
+    backend = HttpBackend()
+
+    assert scrape(backend, "flipkart", "no such laptop") == []
+    assert backend.get_stats()["empty"] == 1
+    assert backend.get_stats()["failures"] == 0
+
+
+def test_scrape_http_error(stub_sites):
+    backend = HttpBackend()
+
+    assert scrape(backend, "flipkart", "blocked query") == []
+    assert backend.get_stats()["failures"] == 1
+
+
+def test_scrape_unreachable_site(monkeypatch):
+    # Bind then close a port so nothing is listening on it
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubSiteHandler)
+    port = server.server_address[1]
+    server.server_close()
+    monkeypatch.setattr(settings, "flipkart_base_url", f"http://127.0.0.1:{port}")
+    backend = HttpBackend()
+
+    assert scrape(backend, "flipkart", "hp victus") == []
+    assert backend.get_stats()["failures"] == 1
+
+
+def test_fetch_prices_with_http_backend(stub_sites, monkeypatch):
+    monkeypatch.setattr(settings, "scraping_enabled", True)
+    monkeypatch.setattr(settings, "scraper_backend", "http")
+    monkeypatch.setattr(scraper_service, "_backend", None)
+
+    async def run():
+        try:
+            return await scraper_service.fetch_prices("hp victus")
+        finally:
+            await scraper_service.stop_scrapers()
+
+    prices = asyncio.run(run())
+    assert prices["scraping_enabled"] is True
+    assert len(prices["flipkart"]) == 3
+    # Croma is client-rendered — the HTTP backend doesn't request it
+    assert prices["croma"] == []
+    assert scraper_service.get_scraper_stats()["unsupported"] == 1
+    assert scraper_service.get_scraper_stats()["backend"] == "http"
@@ -0,0 +1,23 @@
+import pytest
+
+from app.services.spec_classifier import parse_price_inr
+
+
+@pytest.mark.parametrize("value, expected", [
+    (35000, 35000),
+    ("35,000", 35000),
+    ("₹35,000", 35000),
+    ("₹ 54,990.00", 54990),
+    ("Rs. 35,000", 35000),
+    ("INR 1.2L", 120000),
+    ("1.5 lakh", 150000),
+    ("45k", 45000),
+    ("35,000 laptop", 35000),
+])
+def test_parse_price_inr(value, expected):
+    assert parse_price_inr(value) == expected
+
+
+@pytest.mark.parametrize("value", [None, "", "N/A", 0, "₹0"])
+def test_parse_price_inr_unpriced(value):
+    assert parse_price_inr(value) is None
@@ -23,6 +23,42 @@ export const chatAPI = {
     return response.data;
   },
 
+  // Server-Sent Events over POST — onEvent(event, data) is called for each
+  // `token`, `recommendations` and `done` event. Resolves with the `done` payload.
+  streamMessage: async (sessionId, message, onEvent) => {
+    const response = await fetch(`${API_BASE_URL}/chat/message/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ session_id: sessionId, message: message }),
+    });
+    if (!response.ok) {
+      throw new Error(`Request failed with status ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let final = null;
+
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      const frames = buffer.split('\n\n');
+      buffer = frames.pop();
+      for (const frame of frames) {
+        const event = frame.match(/^event: (.*)$/m)?.[1];
+        const data = frame.match(/^data: (.*)$/m)?.[1];
+        if (!event || data === undefined) continue;
+        const payload = JSON.parse(data);
+        if (event === 'done') final = payload;
+        onEvent?.(event, payload);
+      }
+    }
+    return final;
+  },
+
   getSession: async (sessionId) => {
     const response = await api.get(`/chat/session/${sessionId}`);
     return response.data;